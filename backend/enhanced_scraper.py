@@ -18,21 +18,29 @@ from fake_useragent import UserAgent
 logger = logging.getLogger(__name__)
 
 class EnhancedMarketplaceScraper:
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
         self.ua = UserAgent()
-        self.session = None
+        # An injected session is shared and owned by the caller
+        self.session = session
+        self._owns_session = False
+        self.timeout = aiohttp.ClientTimeout(total=15, connect=5)
         self.success_strategies = {}  # Track which strategies work for which sites
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=15, connect=5),
-            connector=aiohttp.TCPConnector(limit=10, limit_per_host=5)
-        )
+        # Standalone use only; the application injects its shared session instead
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=10, limit_per_host=5)
+            )
+            self._owns_session = True
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
+            self.session = None
+            self._owns_session = False
 
     async def scrape_product(self, url: str) -> Dict[str, Any]:
         """
@@ -133,7 +141,7 @@ class EnhancedMarketplaceScraper:
         # Add random delay to appear more human-like
         await asyncio.sleep(random.uniform(1, 3))
         
-        async with self.session.get(url, headers=headers, ssl=False) as response:
+        async with self.session.get(url, headers=headers, ssl=False, timeout=self.timeout) as response:
             response.raise_for_status()
             content = await response.text()
             return await self._parse_content(content, url)
@@ -195,7 +203,7 @@ class EnhancedMarketplaceScraper:
             'Connection': 'keep-alive'
         }
         
-        async with self.session.get(url, headers=mobile_headers, ssl=False) as response:
+        async with self.session.get(url, headers=mobile_headers, ssl=False, timeout=self.timeout) as response:
             response.raise_for_status()
             content = await response.text()
             return await self._parse_content(content, url)
@@ -219,7 +227,7 @@ class EnhancedMarketplaceScraper:
 
     def _parse_olx(self, html_content: str, url: str) -> Dict[str, Any]:
         """Enhanced OLX parser with multiple selectors"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, 'lxml')
         
         # Multiple selector strategies for title
         title_selectors = [
@@ -319,7 +327,7 @@ class EnhancedMarketplaceScraper:
 
     def _parse_generic(self, html_content: str, url: str) -> Dict[str, Any]:
         """Generic parser for unknown platforms"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, 'lxml')
         
         # Try to find title
         title_candidates = [
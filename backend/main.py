@@ -35,8 +35,8 @@ from models import Product, NegotiationParams, ChatMessage, NegotiationSession
 from database import JSONDatabase
 from gemini_service import GeminiOnlyService
 from websocket_manager import ConnectionManager
-from session_manager import AdvancedSessionManager
-from scraper_service import MarketplaceScraper, MarketIntelligence
+from session_manager import AdvancedSessionManager, ActiveSessionData
+from scraper_service import MarketplaceScraper, MarketIntelligence, create_scraper_session, warm_scraper_session
 from enhanced_scraper import EnhancedMarketplaceScraper
 from negotiation_engine import AdvancedNegotiationEngine
 from auth_service import AuthenticationService
@@ -96,9 +96,17 @@ class LogoutRequest(BaseModel):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global mcp_server
+    global mcp_server, http_session, marketplace_scraper, enhanced_scraper
     await db.initialize()
     
+    # One pooled HTTP session shared by every scrape for the app's lifetime
+    http_session = create_scraper_session()
+    marketplace_scraper = MarketplaceScraper(session=http_session)
+    enhanced_scraper = EnhancedMarketplaceScraper(session=http_session)
+    session_manager.enhanced_scraper = enhanced_scraper
+    # Warm DNS and TLS to the marketplace hosts in the background; startup does not wait on it
+    warmup_task = asyncio.create_task(warm_scraper_session(http_session))
+    
     # Initialize MCP server
     try:
         # mcp_server = initialize_mcp_server(db, session_manager)  # Temporarily commented out
@@ -112,8 +120,10 @@ async def lifespan(app: FastAPI):
     logger.info("INFO: - Gemini Fallback: Available")
     logger.info("INFO: - Advanced Negotiation Tools: Market Analysis, Price Calculator, Strategy Advisor")
     yield
-    # Shutdown (if needed)
-    pass
+    # Shutdown
+    warmup_task.cancel()
+    await session_manager.shutdown()
+    await http_session.close()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -267,6 +277,11 @@ auth_service = AuthenticationService()
 enhanced_ai_service = EnhancedAIService(use_langchain=True, use_mcp=False)
 mcp_server = None
 
+# Shared scraping clients, created in lifespan startup
+http_session = None
+marketplace_scraper: Optional[MarketplaceScraper] = None
+enhanced_scraper: Optional[EnhancedMarketplaceScraper] = None
+
 # Update session manager with enhanced AI service
 session_manager.enhanced_ai_service = enhanced_ai_service
 
@@ -885,11 +900,9 @@ async def analyze_market_price(request: URLNegotiationRequest):
         scraping_method = getattr(request, 'scraping_method', 'enhanced')
         
         if scraping_method == 'enhanced':
-            async with EnhancedMarketplaceScraper() as scraper:
-                product_data = await scraper.scrape_product(request.product_url)
+            product_data = await enhanced_scraper.scrape_product(request.product_url)
         else:
-            async with MarketplaceScraper() as scraper:
-                product_data = await scraper.scrape_product(request.product_url)
+            product_data = await marketplace_scraper.scrape_product(request.product_url)
         
         if not product_data:
             raise HTTPException(status_code=400, detail="Could not scrape product information")
@@ -1228,14 +1241,7 @@ async def start_negotiation_legacy(params: NegotiationParams):
             raise HTTPException(status_code=404, detail="Product not found")
         
         # Simple session data for legacy compatibility
-        session_data = {
-            'session': session,
-            'product': product,
-            'market_analysis': {},
-            'strategy': {'approach': params.approach.value},
-            'phase': 'opening',
-            'performance_metrics': {'messages_sent': 0}
-        }
+        session_data = ActiveSessionData(session, product, {}, {'approach': params.approach.value}, phase='opening')
         
         # Store in session manager
         session_manager.active_sessions[session_id] = session_data
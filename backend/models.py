@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -55,6 +55,17 @@ class ChatMessage(BaseModel):
     timestamp: datetime
     sender_type: str  # "human", "ai", "override"
     
+    # Lower-cased content and the string it was computed from; not serialized
+    _content_lower: Optional[tuple] = PrivateAttr(default=None)
+    
+    @property
+    def content_lower(self) -> str:
+        """Lower-cased content, computed once and reused by every keyword scan"""
+        cached = self._content_lower
+        if cached is None or cached[0] is not self.content:
+            cached = self._content_lower = (self.content, self.content.lower())
+        return cached[1]
+    
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
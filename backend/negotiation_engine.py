@@ -4,16 +4,23 @@ Implements sophisticated negotiation tactics and decision-making logic
 """
 
 import asyncio
+import functools
 from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 from datetime import datetime, timedelta
 import json
 import random
+import sys
 from models import ChatMessage, Product, NegotiationApproach, PurchaseTimeline
 import logging
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=4096)
+def _fmt_inr(amount: int) -> str:
+    """Format an amount in rupees with thousands separators (memoized per amount)"""
+    return f"₹{amount:,}"
+
 class NegotiationPhase(Enum):
     OPENING = "opening"
     EXPLORATION = "exploration"
@@ -114,7 +121,7 @@ class AdvancedNegotiationEngine:
         
         # Check for closing indicators
         closing_keywords = ['deal', 'final', 'accept', 'agree', 'done', 'sold']
-        recent_messages = [msg.content.lower() for msg in chat_history[-3:]]
+        recent_messages = [msg.content_lower for msg in chat_history[-3:]]
         
         if any(keyword in ' '.join(recent_messages) for keyword in closing_keywords):
             return NegotiationPhase.CLOSING
@@ -124,7 +131,7 @@ class AdvancedNegotiationEngine:
             return NegotiationPhase.DEADLOCK
         
         # Exploration vs Bargaining
-        price_mentioned = any('price' in msg.content.lower() or '₹' in msg.content 
+        price_mentioned = any('price' in msg.content_lower or '₹' in msg.content 
                             for msg in chat_history[-3:])
         
         if price_mentioned and message_count > 3:
@@ -250,7 +257,8 @@ class ConversationAnalyzer:
         """Infer seller personality type"""
         
         # Analyze message patterns
-        avg_response_length = sum(len(msg.content) for msg in chat_history if msg.sender == 'seller') / max(1, len([msg for msg in chat_history if msg.sender == 'seller']))
+        seller_lengths = [len(msg.content) for msg in chat_history if msg.sender == 'seller']
+        avg_response_length = sum(seller_lengths) / max(1, len(seller_lengths))
         
         if 'firm' in message or 'final' in message or 'non-negotiable' in message:
             return SellerPersonality.FIRM
@@ -536,7 +544,23 @@ class DecisionEngine:
 class ResponseGenerator:
     """Generates contextual negotiation responses using selected tactics"""
     
+    _BUNDLE_ITEMS = ('original accessories', 'delivery', 'warranty extension')
+    _WALKAWAY_PREFIX = sys.intern("I understand your position, but ")
+    _WALKAWAY_SUFFIX = sys.intern(
+        " is really the maximum I can go. "
+        "If you change your mind, please let me know. Otherwise, I'll have to consider other options. "
+        "Thank you for your time."
+    )
+    
     def __init__(self):
+        # Dedicated generator; a single getrandbits call per pick avoids the
+        # rejection loop in random.choice
+        self._rng = random.Random()
+        self._rand_bits = self._rng.getrandbits
+        
+        # Bundling items are drawn in batches and handed out one per turn
+        self._bundle_buf: List[str] = []
+        self._bundle_idx = 0
         self.tactic_templates = {
             NegotiationTactic.ANCHORING: [
                 "Based on current market rates for similar items, I was thinking around ₹{offer:,}. What do you think?",
@@ -571,6 +595,42 @@ class ResponseGenerator:
                 "₹{offer:,} and we have a deal. I'll bring cash for immediate pickup."
             ]
         }
+        
+        # Templates pre-split around their slots so rendering is plain concatenation
+        self._template_parts = {
+            tactic: [self._split_template(t) for t in templates]
+            for tactic, templates in self.tactic_templates.items()
+        }
+        self._default_offer_parts = [self._split_template("I can offer ₹{offer:,}. What do you think?")]
+    
+    @staticmethod
+    def _split_template(template: str) -> Tuple[str, ...]:
+        """Split a template into (prefix, suffix) or (prefix, mid, suffix) around its slots"""
+        prefix, rest = template.split("₹{offer:,}", 1)
+        if "{additional_item}" in rest:
+            mid, suffix = rest.split("{additional_item}", 1)
+            return (prefix, mid, suffix)
+        return (prefix, rest)
+    
+    @staticmethod
+    def _render_template(parts: Tuple[str, ...], offer: int, additional_item: str = "") -> str:
+        """Render pre-split template parts"""
+        if len(parts) == 3:
+            return parts[0] + _fmt_inr(offer) + parts[1] + additional_item + parts[2]
+        return parts[0] + _fmt_inr(offer) + parts[1]
+    
+    def _pick(self, options: List[Any]) -> Any:
+        """Pick a random element (32 random bits keep the modulo bias negligible)"""
+        return options[self._rand_bits(32) % len(options)]
+    
+    def _next_bundle_item(self) -> str:
+        """Return the next pre-drawn bundling item, refilling the batch when exhausted"""
+        if self._bundle_idx >= len(self._bundle_buf):
+            self._bundle_buf = self._rng.choices(self._BUNDLE_ITEMS, k=32)
+            self._bundle_idx = 0
+        item = self._bundle_buf[self._bundle_idx]
+        self._bundle_idx += 1
+        return item
     
     async def generate_strategic_response(
         self,
@@ -587,7 +647,9 @@ class ResponseGenerator:
         talking_points = strategy.get('talking_points', {})
         
         if action == 'accept':
-            return self._generate_acceptance_response(seller_analysis, session_data, talking_points)
+            if talking_points:
+                return self._generate_acceptance_with_logistics(seller_analysis, session_data, talking_points)
+            return self._generate_acceptance_response(seller_analysis, session_data)
         elif action == 'walk_away':
             return self._generate_walkaway_response(seller_analysis, session_data, talking_points)
         elif action in ['counter_offer', 'final_offer']:
@@ -625,12 +687,12 @@ class ResponseGenerator:
         # 2. Use market-based arguments from analysis
         price_arguments = talking_points.get('price_arguments', [])
         if price_arguments and NegotiationTactic.SOCIAL_PROOF in tactics:
-            response_parts.append(random.choice(price_arguments))
+            response_parts.append(self._pick(price_arguments))
         
         # 3. Address condition concerns if relevant
         condition_points = talking_points.get('condition_points', [])
         if condition_points and strategy.get('condition_factors', {}).get('concerns'):
-            response_parts.append(random.choice(condition_points))
+            response_parts.append(self._pick(condition_points))
         
         # 4. Present the offer with appropriate tactic
         offer_statement = self._format_offer_with_tactic(
@@ -642,7 +704,7 @@ class ResponseGenerator:
         if decision.get('action') == 'final_offer':
             closing_args = talking_points.get('closing_arguments', [])
             if closing_args:
-                response_parts.append(random.choice(closing_args))
+                response_parts.append(self._pick(closing_args))
             else:
                 response_parts.append("This is my best offer. Please let me know if this works for you.")
         
@@ -661,14 +723,14 @@ class ResponseGenerator:
         # Use opening points from comprehensive analysis
         opening_points = talking_points.get('opening_statements', [])
         if opening_points:
-            main_message = random.choice(opening_points)
+            main_message = self._pick(opening_points)
         else:
             main_message = f"I'm interested in your {session_data.get('product', {}).get('category', 'item')}."
         
         # Add market comparison if available
         market_comparisons = talking_points.get('market_comparisons', [])
         if market_comparisons:
-            market_info = random.choice(market_comparisons)
+            market_info = self._pick(market_comparisons)
             return f"{main_message} {market_info} What are your thoughts on the pricing?"
         
         return f"{main_message} Could you tell me more about its condition and if there's any flexibility in the price?"
@@ -688,30 +750,28 @@ class ResponseGenerator:
         if primary_tactic == NegotiationTactic.ANCHORING:
             market_analysis = strategy.get('market_position', 'unknown')
             if market_analysis == 'above_market':
-                return f"Based on market research, I can offer ₹{offer_amount:,}. This reflects the current market value for similar items."
+                return f"Based on market research, I can offer {_fmt_inr(offer_amount)}. This reflects the current market value for similar items."
             else:
-                return f"Considering all factors, I can offer ₹{offer_amount:,}."
+                return f"Considering all factors, I can offer {_fmt_inr(offer_amount)}."
         
         # Use urgency from talking points
         elif primary_tactic == NegotiationTactic.URGENCY:
-            return f"I'm ready to proceed immediately with ₹{offer_amount:,} if we can agree today."
+            return f"I'm ready to proceed immediately with {_fmt_inr(offer_amount)} if we can agree today."
         
         # Use condition-based reasoning
         elif primary_tactic == NegotiationTactic.AUTHORITY:
             condition_concerns = strategy.get('condition_factors', {}).get('concerns', [])
             if condition_concerns:
-                return f"Given the condition factors, my budget allows for ₹{offer_amount:,}."
+                return f"Given the condition factors, my budget allows for {_fmt_inr(offer_amount)}."
             else:
-                return f"Based on my assessment, ₹{offer_amount:,} would be fair."
+                return f"Based on my assessment, {_fmt_inr(offer_amount)} would be fair."
         
         # Default tactical approach
         else:
-            templates = self.tactic_templates.get(primary_tactic, [
-                "I can offer ₹{offer:,}. What do you think?"
-            ])
-            return random.choice(templates).format(offer=offer_amount)
+            templates = self._template_parts.get(primary_tactic, self._default_offer_parts)
+            return self._render_template(self._pick(templates), offer_amount)
     
-    def _generate_acceptance_response(
+    def _generate_acceptance_with_logistics(
         self, 
         seller_analysis: Dict[str, Any], 
         session_data: Dict[str, Any],
@@ -730,12 +790,12 @@ class ResponseGenerator:
     ) -> str:
         """Generate polite walkaway response"""
         
-        strategy = session_data.get('strategy', {})
-        max_budget = strategy.get('maximum_budget', 0)
+        try:
+            max_budget = session_data['strategy']['maximum_budget']
+        except KeyError:
+            max_budget = 0
         
-        return (f"I understand your position, but ₹{max_budget:,} is really the maximum I can go. "
-                f"If you change your mind, please let me know. Otherwise, I'll have to consider other options. "
-                f"Thank you for your time.")
+        return self._WALKAWAY_PREFIX + _fmt_inr(max_budget) + self._WALKAWAY_SUFFIX
     
     def _generate_tactical_response(
         self, 
@@ -747,28 +807,27 @@ class ResponseGenerator:
     ) -> str:
         """Generate response using negotiation tactics"""
         
-        offer = decision.get('offer', session_data.get('target_price'))
+        offer = decision.get('offer')
+        if offer is None:
+            offer = session_data.get('target_price')
         
         if not tactics:
-            return f"I understand your position. Would ₹{offer:,} be acceptable?"
+            return f"I understand your position. Would {_fmt_inr(offer)} be acceptable?"
         
         # Select primary tactic
-        primary_tactic = tactics[0]
-        templates = self.tactic_templates.get(primary_tactic, [])
+        templates = self._template_parts.get(tactics[0])
         
         if templates:
-            template = random.choice(templates)
+            render = self._render_template
+            parts = templates[self._rand_bits(32) % len(templates)]
             
             # Handle bundling tactic
-            if primary_tactic == NegotiationTactic.BUNDLING:
-                additional_items = ['original accessories', 'delivery', 'warranty extension']
-                additional_item = random.choice(additional_items)
-                return template.format(offer=offer, additional_item=additional_item)
-            else:
-                return template.format(offer=offer)
+            if len(parts) == 3:
+                return render(parts, offer, self._next_bundle_item())
+            return render(parts, offer)
         
         # Fallback
-        return f"Considering everything, I think ₹{offer:,} would be fair. What do you say?"
+        return f"Considering everything, I think {_fmt_inr(offer)} would be fair. What do you say?"
     
     def _generate_acceptance_response(self, seller_analysis: Dict[str, Any], session_data: Dict[str, Any]) -> str:
         """Generate acceptance response"""
@@ -777,7 +836,7 @@ class ResponseGenerator:
             "Excellent! I accept your offer. How should we proceed with the payment and pickup?",
             "Great! That's exactly what I was hoping for. Shall we exchange contact details?"
         ]
-        return random.choice(responses)
+        return self._pick(responses)
     
     def _generate_exploratory_response(self, seller_analysis: Dict[str, Any], session_data: Dict[str, Any]) -> str:
         """Generate exploratory/information gathering response"""
@@ -786,4 +845,4 @@ class ResponseGenerator:
             "This looks perfect for what I need. Is there any flexibility on the pricing?",
             "I've been looking for exactly this item. What's the best price you can offer?"
         ]
-        return random.choice(responses)
\ No newline at end of file
+        return self._pick(responses)
\ No newline at end of file
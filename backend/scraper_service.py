@@ -5,24 +5,45 @@ Enhanced with market intelligence and negotiation insights
 
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from typing import Dict, Any, Optional, List
+from lxml import etree
+from typing import Dict, Any, Optional, List, Callable, Tuple, Set, FrozenSet
 import re
 import logging
-from datetime import datetime
-import json
+from datetime import datetime, timedelta
+from dateutil import parser as date_parser
 import random
-
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional, Any
-import re
-from urllib.parse import urlparse, urljoin
-from datetime import datetime
-import json
+import copy
+import functools
+import itertools
+import orjson
+import numpy as np
+from collections import defaultdict
+from dataclasses import dataclass
+from cachetools import LRUCache, TTLCache
+from urllib.parse import urlparse, urljoin, ParseResult
 from models import Product
-import logging
+from negotiation_engine import _fmt_inr
+
+# Lexbor-backed parser for the OLX extraction hot path (BeautifulSoup is the fallback)
+try:
+    from selectolax.lexbor import LexborHTMLParser, LexborNode
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# c-ares DNS resolver for the shared scraper session (threaded getaddrinfo is the fallback)
+try:
+    import aiodns  # noqa: F401  (required by aiohttp.AsyncResolver)
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+# Aho-Corasick automaton for multi-phrase title checks (compiled regex is the fallback)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # Import enhanced scraper
 try:
@@ -34,58 +55,448 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Price patterns, compiled once at import
+_PRICE_NOISE_RE = re.compile(r'(per|month|year|day|week)', re.IGNORECASE)
+
+# PRIORITY 1: Indian Rupee symbol patterns (₹)
+_RUPEE_PATTERNS = [
+    re.compile(r'₹\s*(\d+(?:,\d+)*(?:\.\d+)?)', re.IGNORECASE),      # ₹50,000 or ₹50000.00
+    re.compile(r'₹\s*(\d+(?:\.\d+)?)\s*(?:lakh|lac)', re.IGNORECASE), # ₹5.5 lakh
+    re.compile(r'₹\s*(\d+(?:\.\d+)?)\s*(?:crore)', re.IGNORECASE),    # ₹1.2 crore
+]
+
+# PRIORITY 2: Alternative Indian currency formats
+_ALT_PRICE_PATTERNS = [
+    re.compile(r'Rs\.?\s*(\d+(?:,\d+)*)', re.IGNORECASE),            # Rs.50000 or Rs. 50,000
+    re.compile(r'INR\s*(\d+(?:,\d+)*)', re.IGNORECASE),              # INR 50000
+    re.compile(r'rupees?\s*(\d+(?:,\d+)*)', re.IGNORECASE),          # rupees 50000
+    re.compile(r'(\d+(?:\.\d+)?)\s*lakh', re.IGNORECASE),            # 5 lakh or 5.5 lakh
+    re.compile(r'(\d+(?:\.\d+)?)\s*crore', re.IGNORECASE),           # 2 crore or 2.5 crore
+]
+
+# PRIORITY 3: Numbers only in price-like contexts (avoids IDs)
+_NUMBER_PATTERNS = [
+    re.compile(r'(?:price|cost|amount|value|worth)[\s:]*(\d{3,}(?:,\d+)*)', re.IGNORECASE),  # "Price: 50000"
+    re.compile(r'(\d{3,}(?:,\d+)*)\s*(?:only|/-|/\-)', re.IGNORECASE),                      # "50000 only" or "50000/-"
+]
+
+# URL/title helpers
+_URL_SEPARATOR_RE = re.compile(r'[/_\-]')
+_DIGITS_RE = re.compile(r'\d+')
+_OLX_TITLE_SUFFIX_RE = re.compile(r'\s*\|\s*OLX.*$')
+_TEL_RE = re.compile(r'tel:(\d+)')
+_CITY_RE = re.compile(r'chennai|mumbai|delhi|bangalore|hyderabad|pune|kolkata')
+_DAYS_AGO_RE = re.compile(r'(\d+)\s*days?\s*ago')
+
+# Keyword dispatch tables: named groups are listed in priority order
+_PRICE_CATEGORY_RE = re.compile(
+    r'(?P<laptop>laptop|computer|macbook)'
+    r'|(?P<phone>phone|mobile|iphone|samsung)'
+    r'|(?P<car>car|vehicle|auto)'
+    r'|(?P<bike>bike|motorcycle|scooter)'
+    r'|(?P<furniture>furniture|sofa|table|chair)'
+    r'|(?P<tv>tv|television|monitor)'
+)
+_PRICE_TABLE = {
+    'laptop': 35000,
+    'phone': 15000,
+    'car': 300000,
+    'bike': 80000,
+    'furniture': 25000,
+    'tv': 20000,
+}
+
+_URL_PRODUCT_RE = re.compile(
+    r'(?P<iphone>iphone)|(?P<samsung>samsung)|(?P<mobile_phone>mobile-phone)'
+    r'|(?P<laptop>laptop)|(?P<bike>bike)|(?P<car>car)'
+)
+_URL_PRODUCT_LABELS = {
+    'iphone': 'iPhone',
+    'samsung': 'Samsung Phone',
+    'mobile_phone': 'Mobile Phone',
+    'laptop': 'Laptop',
+    'bike': 'Bike',
+    'car': 'Car',
+}
+
+_CATEGORY_RE = re.compile(
+    r'(?P<mobile>iphone|samsung|mobile|phone|smartphone)'
+    r'|(?P<laptop>laptop|macbook|computer|pc)'
+    r'|(?P<tv>tv|television|led|lcd)'
+    r'|(?P<cars>car|honda|maruti|hyundai|tata)'
+    r'|(?P<bike>bike|motorcycle|activa|scooty)'
+    r'|(?P<gaming>ps5|xbox|playstation|nintendo)'
+    r'|(?P<home>furniture|sofa|bed|table)'
+)
+_CATEGORY_LABELS = {
+    'mobile': 'Mobile Phones',
+    'laptop': 'Laptops & Computers',
+    'tv': 'Electronics',
+    'cars': 'Cars',
+    'bike': 'Vehicles',
+    'gaming': 'Gaming',
+    'home': 'Home & Garden',
+}
+
+_CONDITION_RE = re.compile(
+    r'(?P<Excellent>excellent|perfect|like new|mint)'
+    r'|(?P<Good>good|working|fine)'
+    r'|(?P<Fair>fair|used|normal wear)'
+    r'|(?P<Poor>poor|damaged|broken)'
+)
+
+def _match_keyword_group(pattern: re.Pattern, text: str) -> Optional[str]:
+    """Highest-priority named group of pattern matched anywhere in text, in one scan"""
+    found = {match.lastgroup for match in pattern.finditer(text)}
+    return next((group for group in pattern.groupindex if group in found), None)
+
+# Titles that indicate a category/listing page rather than a product page
+CATEGORY_INDICATORS = [
+    'buy & sell',
+    'second hand',
+    'used cars in',
+    'mobiles in',
+    'bikes in',
+    'for sale',
+    'listings in',
+    'browse all',
+    'find ads',
+    'classified',
+    'olx.in'
+]
+
+# Titles of redirected category/listing pages seen in scraped results
+SUSPICIOUS_PHRASES = [
+    'buy & sell',
+    'second hand',
+    'used cars in',
+    'mobiles in',
+    'for sale',
+    'listings in',
+    'browse all'
+]
+
+def _build_phrase_matcher(phrases: List[str]) -> Callable[[str], bool]:
+    """Build a single-pass predicate telling whether text contains any of the phrases"""
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for phrase in phrases:
+            automaton.add_word(phrase, phrase)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+    
+    pattern = re.compile('|'.join(map(re.escape, phrases)))
+    return lambda text: pattern.search(text) is not None
+
+_has_category_indicator = _build_phrase_matcher(CATEGORY_INDICATORS)
+_has_suspicious_phrase = _build_phrase_matcher(SUSPICIOUS_PHRASES)
+
+# Listing keyword buckets used by MarketIntelligence, kept in reporting order
+POSITIVE_KEYWORDS = [
+    'excellent', 'perfect', 'mint', 'brand new', 'like new', 'unused',
+    'warranty', 'box pack', 'original', 'pristine', 'immaculate'
+]
+NEGATIVE_KEYWORDS = [
+    'damaged', 'broken', 'scratched', 'dent', 'crack', 'issue',
+    'problem', 'fault', 'repair needed', 'not working', 'defect'
+]
+MAINTENANCE_KEYWORDS = ['serviced', 'maintained', 'cleaned', 'tested', 'working perfectly']
+PREMIUM_KEYWORDS = ['warranty', 'original', 'accessories', 'bill', 'invoice', 'sealed']
+DISCOUNT_KEYWORDS = ['urgent', 'quick sale', 'moving', 'need cash', 'negotiable']
+URGENT_KEYWORDS = ['urgent', 'quick sale', 'moving', 'immediate', 'asap']
+
+def _build_keyword_scanner(keywords: List[str]) -> Callable[[str], Set[str]]:
+    """Build a single-pass function returning which of the keywords occur in text"""
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: {keyword for _, keyword in automaton.iter(text)}
+    
+    # A zero-width lookahead reports overlapping keywords in one regex pass, but only the
+    # first alternative per position, so keywords that prefix another need substring checks
+    if any(other != keyword and other.startswith(keyword) for keyword in keywords for other in keywords):
+        return lambda text: {keyword for keyword in keywords if keyword in text}
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+    return lambda text: set(pattern.findall(text))
+
+_scan_listing_keywords = _build_keyword_scanner(list(dict.fromkeys(
+    POSITIVE_KEYWORDS + NEGATIVE_KEYWORDS + MAINTENANCE_KEYWORDS
+    + PREMIUM_KEYWORDS + DISCOUNT_KEYWORDS + URGENT_KEYWORDS
+)))
+
+# OLX detail-field selector groups; each field is resolved with one query
+_OLX_DESCRIPTION_SELECTOR = '[data-aut-id="itemDescriptionText"], .description-text, .ad-description'
+_OLX_SELLER_NAME_SELECTOR = '[data-aut-id="profileName"], .seller-name, .profile-name'
+_OLX_CONTACT_SELECTOR = '[data-aut-id="chatButton"], .contact-number, .seller-phone'
+_OLX_LOCATION_SELECTOR = '[data-aut-id="itemLocation"], .location-text, .ad-location'
+_OLX_IMAGE_SELECTOR = '.gallery-image img, .image-gallery img, [data-aut-id="defaultImg"]'
+_OLX_FEATURE_SELECTOR = '.features-list li, .specifications li, .details-list li'
+_OLX_DATE_SELECTOR = '[data-aut-id="itemCreationDate"], .post-date, .ad-date'
+
+# Upper bound on HTML read per page; bounds worst-case parse time
+MAX_HTML_BYTES = 1_048_576
+
+# data-aut-id markers captured while streaming an OLX page; reading stops once all are seen
+_OLX_STREAM_FIELDS = {
+    'itemTitle': 'title',
+    'itemPrice': 'price',
+    'itemDescriptionText': 'description',
+}
+
+@functools.lru_cache(maxsize=4096)
+def _cached_urlparse(url: str) -> ParseResult:
+    """urlparse memoized per URL; the same URL is parsed by several helpers per scrape"""
+    return urlparse(url)
+
+def _url_domain(url: str) -> str:
+    """Lower-cased network location of a URL"""
+    return _cached_urlparse(url).netloc.lower()
+
+def _is_html_response(response: aiohttp.ClientResponse) -> bool:
+    """Whether the response declares an HTML body"""
+    return 'text/html' in response.headers.get('Content-Type', '')
+
+async def _stream_elements(response: aiohttp.ClientResponse, tags: Tuple[str, ...],
+                           accept: Callable[[Any], bool] = lambda element: True,
+                           until: Optional[str] = None) -> Dict[str, Any]:
+    """
+    First accepted element of each tag, parsed incrementally from the response body.
+    Reading stops once every tag is found, when the `until` element closes,
+    or after MAX_HTML_BYTES, so the full page is rarely downloaded or parsed.
+    """
+    parser = etree.HTMLPullParser(events=('end',), tag=tags + ((until,) if until else ()),
+                                  encoding=response.charset)
+    found = {}
+    size = 0
+    
+    async for chunk in response.content.iter_chunked(16384):
+        chunk = chunk[:MAX_HTML_BYTES - size]
+        size += len(chunk)
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            if element.tag == until:
+                return found
+            if element.tag not in found and accept(element):
+                found[element.tag] = element
+        
+        if len(found) == len(tags) or size >= MAX_HTML_BYTES:
+            break
+    return found
+
+def _element_text(element: Any, strip: bool = True) -> str:
+    """Text content of a streamed lxml element"""
+    text = ''.join(element.itertext())
+    return text.strip() if strip else text
+
+def _retry_backoff(headers: Any, retry: int) -> float:
+    """
+    Seconds to wait before retrying a throttled request.
+    Honors Retry-After / RateLimit-Reset (delta-seconds), otherwise jittered exponential backoff.
+    """
+    for name in ('Retry-After', 'RateLimit-Reset'):
+        try:
+            delay = float(headers.get(name) or 0)
+        except ValueError:
+            # HTTP-date form is rare for OLX; use our own backoff instead
+            continue
+        if delay > 0:
+            return min(delay, MAX_RETRY_BACKOFF)
+    return min(2 ** retry, 8) + random.random()
+
+@functools.lru_cache(maxsize=8192)
+def _parse_absolute_date(date_text: str) -> Optional[datetime]:
+    """Parse an absolute listing date (ISO, dd/mm/yyyy, dd-mm-yyyy, ...), or None"""
+    try:
+        # dayfirst would swap month and day of ISO dates, so those are parsed directly
+        return datetime.fromisoformat(date_text)
+    except ValueError:
+        pass
+    try:
+        return date_parser.parse(date_text, dayfirst=True)
+    except (ValueError, OverflowError):
+        return None
+
+def _make_soup(html: str) -> Any:
+    """Parse HTML with lxml, falling back to the pure-Python parser if lxml is missing"""
+    # Imported lazily: bs4 is only needed for the non-OLX scrapers and the selectolax fallback
+    from bs4 import BeautifulSoup, FeatureNotFound
+    try:
+        return BeautifulSoup(html, 'lxml')
+    except FeatureNotFound:
+        return BeautifulSoup(html, 'html.parser')
+
+def _is_lexbor(node: Any) -> bool:
+    """Whether a parse tree or node comes from selectolax rather than BeautifulSoup"""
+    return SELECTOLAX_AVAILABLE and isinstance(node, (LexborHTMLParser, LexborNode))
+
+def _make_tree(html: str) -> Any:
+    """Parse HTML with selectolax when available, otherwise BeautifulSoup"""
+    if SELECTOLAX_AVAILABLE:
+        return LexborHTMLParser(html)
+    return _make_soup(html)
+
+@functools.lru_cache(maxsize=256)
+def _compiled_selector(selector: str) -> Any:
+    """soupsieve-compiled selector for the BeautifulSoup path, compiled once per selector string"""
+    import soupsieve
+    return soupsieve.compile(selector)
+
+def _css(tree: Any, selector: str) -> List[Any]:
+    """All nodes matching a CSS selector in either parse tree"""
+    if _is_lexbor(tree):
+        return tree.css(selector)
+    return _compiled_selector(selector).select(tree)
+
+def _css_first(tree: Any, selector: str) -> Any:
+    """First node matching a CSS selector in either parse tree, or None"""
+    if _is_lexbor(tree):
+        return tree.css_first(selector)
+    return _compiled_selector(selector).select_one(tree)
+
+def _node_text(node: Any) -> str:
+    """Stripped text content of a node"""
+    if _is_lexbor(node):
+        return node.text(strip=True)
+    return node.get_text(strip=True)
+
+def _node_attr(node: Any, name: str) -> Optional[str]:
+    """Attribute value of a node, or None"""
+    if _is_lexbor(node):
+        return node.attributes.get(name)
+    return node.get(name)
+
+# User agent rotation for better success rate
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0',
+]
+
+# Concurrent scrapes allowed against one marketplace host
+MAX_CONCURRENT_PER_HOST = 8
+
+# Marketplace hosts whose connections are pre-warmed at startup
+KNOWN_MARKETPLACE_HOSTS = ('www.olx.in', 'www.quikr.com', 'www.facebook.com')
+
+# Statuses that signal throttling and are worth retrying after a backoff
+RETRYABLE_STATUSES = frozenset({429, 503})
+MAX_RETRY_BACKOFF = 10.0
+
+def create_scraper_session() -> aiohttp.ClientSession:
+    """
+    Create the HTTP session shared by all scrapers.
+    Built once at application startup so keep-alive connections are reused across scrapes.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=200,
+            limit_per_host=MAX_CONCURRENT_PER_HOST,
+            resolver=aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None,
+            # The scrapers hit a handful of fixed marketplace hosts; keep their addresses for an hour
+            ttl_dns_cache=3600,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True
+        ),
+        # Default for call sites that don't pass their own (shorter) timeout
+        timeout=aiohttp.ClientTimeout(total=30),
+        # No session-wide User-Agent: scrapers rotate it per request
+        headers={
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'br, gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        })
+
+async def warm_scraper_session(session: aiohttp.ClientSession, hosts=KNOWN_MARKETPLACE_HOSTS):
+    """
+    Resolve DNS and open keep-alive TLS connections to the known marketplace hosts,
+    so the first real scrape of each host skips those round trips. Failures are ignored.
+    """
+    async def warm(host: str):
+        try:
+            async with session.head(f'https://{host}/', timeout=aiohttp.ClientTimeout(total=5)):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Connection warm-up failed for {host}: {e}")
+    
+    await asyncio.gather(*(warm(host) for host in hosts))
+
 class MarketplaceScraper:
-    def __init__(self):
-        self.session = None
+    # Head start given to the first OLX attempt before a hedged second one is launched
+    OLX_HEDGE_DELAY = 0.3
+    # Pages larger than this are category/search listings, not a single product
+    OLX_MAX_LISTING_BYTES = 2_000_000
+    # Retries after a throttled (429/503) response; only the primary attempt spends them
+    OLX_MAX_RETRIES = 2
+    
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        # An injected session is shared and owned by the caller
+        self.session = session
+        self._owns_session = False
+        self.enhanced_scraper = None
+        self.user_agents = USER_AGENTS
+        # Start at a random offset so concurrent scrapers don't walk the list in lockstep
+        offset = random.randrange(len(USER_AGENTS))
+        self._ua_cycle = itertools.cycle(USER_AGENTS[offset:] + USER_AGENTS[:offset])
+        self._per_host_sem = defaultdict(lambda: asyncio.Semaphore(MAX_CONCURRENT_PER_HOST))
+        # url -> (etag, last_modified, result) for conditional re-fetches
+        self._response_cache = TTLCache(maxsize=10_000, ttl=3600)
+        # Domain keyword -> legacy scraper; unknown platforms use _scrape_generic
+        self._dispatch = {
+            'olx': self._scrape_olx,
+            'facebook': self._scrape_facebook,
+            'quikr': self._scrape_quikr,
+        }
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': 'br, gzip, deflate',
             'Connection': 'keep-alive',
         }
     
     async def __aenter__(self):
-        # User agent rotation for better success rate
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0',
-        ]
-        
-        self.session = aiohttp.ClientSession(
-            headers={
-            'User-Agent': random.choice(self.user_agents),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        # Standalone use only; the application injects its shared session instead
+        if self.session is None:
+            self.session = create_scraper_session()
+            self._owns_session = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
+            self.session = None
+            self._owns_session = False
+    
+    def _next_user_agent(self) -> str:
+        """Next User-Agent in the rotation; consecutive requests never share one"""
+        return next(self._ua_cycle)
     
     async def scrape_product(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Enhanced scrape product information from marketplace URL
         Uses multiple strategies for better success rate
         """
+        domain = _url_domain(url)
         try:
             # Validate URL first
-            if not self._is_valid_product_url(url):
+            if not self._is_valid_product_url(url, domain):
                 logger.warning(f"Invalid or non-product URL detected: {url}")
-                return self._create_fallback_product(url)
+                return self._create_fallback_product(url, domain=domain)
             
-            # Try enhanced scraper first if available
-            if ENHANCED_SCRAPER_AVAILABLE:
-                try:
-                    async with EnhancedMarketplaceScraper() as enhanced_scraper:
-                        result = await enhanced_scraper.scrape_product(url)
+            # Bound concurrent requests per marketplace host to avoid rate limiting
+            async with self._per_host_sem[domain]:
+                # Try enhanced scraper first if available
+                if ENHANCED_SCRAPER_AVAILABLE:
+                    try:
+                        if self.enhanced_scraper is None:
+                            self.enhanced_scraper = EnhancedMarketplaceScraper(session=self.session)
+                        result = await self.enhanced_scraper.scrape_product(url)
                         
                         # Better validation of scraping success
                         if self._validate_scraped_result(result, url):
@@ -93,28 +504,22 @@ class MarketplaceScraper:
                             return result
                         else:
                             logger.warning(f"⚠️ Enhanced scraper returned invalid data for {url}")
-                except Exception as e:
-                    logger.warning(f"Enhanced scraper failed: {e}, falling back to legacy scraper")
-            
-            # Fallback to legacy scraper
-            domain = urlparse(url).netloc.lower()
-            
-            if 'olx' in domain:
-                result = await self._scrape_olx(url)
-            elif 'facebook' in domain:
-                result = await self._scrape_facebook(url)
-            elif 'quikr' in domain:
-                result = await self._scrape_quikr(url)
-            else:
-                # Generic scraper for unknown platforms
-                result = await self._scrape_generic(url)
-            
-            # Validate the result
-            if self._validate_scraped_result(result, url):
-                return result
-            else:
-                logger.warning(f"Legacy scraper returned invalid data for {url}")
-                return self._create_fallback_product(url)
+                    except Exception as e:
+                        logger.warning(f"Enhanced scraper failed: {e}, falling back to legacy scraper")
+                
+                # Fallback to legacy scraper
+                handler = next(
+                    (fn for key, fn in self._dispatch.items() if key in domain),
+                    self._scrape_generic
+                )
+                result = await handler(url)
+                
+                # Validate the result
+                if self._validate_scraped_result(result, url):
+                    return result
+                else:
+                    logger.warning(f"Legacy scraper returned invalid data for {url}")
+                    return self._create_fallback_product(url, domain=domain)
                 
         except Exception as e:
             error_msg = str(e) or "Unknown error occurred during scraping"
@@ -122,97 +527,227 @@ class MarketplaceScraper:
             logger.exception("Full exception details:")
             
             # Return fallback product instead of None
-            return self._create_fallback_product(url)
+            return self._create_fallback_product(url, domain=domain)
     
     async def _scrape_olx(self, url: str) -> Optional[Dict[str, Any]]:
-        """Scrape OLX product listing with robust fallback handling"""
+        """Scrape OLX product listing with a hedged second attempt and robust fallback handling"""
         try:
-            # Add retry logic with much shorter timeout for better reliability
-            for attempt in range(3):  # Max 3 attempts
-                try:
-                    logger.info(f"Scraping OLX attempt {attempt + 1}: {url}")
-                    timeout = aiohttp.ClientTimeout(total=8, connect=3)  # Much shorter timeout
-                    
-                    # Add random delay between attempts
-                    if attempt > 0:
-                        await asyncio.sleep(random.uniform(1, 2))
+            # Cheap HEAD probe for listings we have not scraped before
+            if url not in self._response_cache and not await self._probe_olx_listing(url):
+                return self._create_fallback_product(url)
+            
+            # Set by either attempt on 429/503 so no hedge is sent to a throttling host
+            throttled = asyncio.Event()
+            pending = {asyncio.create_task(self._fetch_olx_listing(url, 1, throttled=throttled))}
+            hedged = False
+            fallback = None
+            
+            try:
+                while pending:
+                    # Give the first attempt a head start before hedging with a second one
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=None if hedged else self.OLX_HEDGE_DELAY,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
                     
-                    async with self.session.get(url, timeout=timeout) as response:
-                        if response.status != 200:
-                            logger.warning(f"OLX returned status {response.status} for {url} (attempt {attempt + 1})")
-                            if attempt == 1:  # Last attempt
-                                return self._create_fallback_product(url)
-                            continue
-                        
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Check if page loaded properly
-                        if not soup.find('title'):
-                            logger.warning(f"OLX page appears to be empty for {url} (attempt {attempt + 1})")
-                            if attempt == 1:  # Last attempt
-                                return self._create_fallback_product(url)
+                    for task in done:
+                        try:
+                            result = task.result()
+                        except asyncio.TimeoutError:
+                            logger.warning(f"Timeout scraping OLX {url}")
                             continue
-                        
-                        # Extract product information with fallbacks
-                        title = self._extract_olx_title(soup) or self._extract_title_from_url(url)
-                        price = self._extract_olx_price(soup)
-                        description = self._extract_olx_description(soup) or "Product description not available"
-                        seller_info = self._extract_olx_seller(soup)
-                        location = self._extract_olx_location(soup) or "Location not specified"
-                        images = self._extract_olx_images(soup)
-                        features = self._extract_olx_features(soup)
-                        posted_date = self._extract_olx_date(soup)
-                        
-                        # If we couldn't extract basic info, try again or use fallback
-                        # Debug logging
-                        logger.info(f"Extracted title: '{title}', price: ₹{price}")
-                        
-                        if not title or price == 0:
-                            logger.warning(f"Could not extract basic info from OLX {url} (attempt {attempt + 1})")
-                            logger.info(f"Page title from HTML: {soup.find('title').get_text() if soup.find('title') else 'No title'}")
-                            if attempt == 1:  # Last attempt
-                                return self._create_fallback_product(url, title, price)
+                        except Exception as e:
+                            logger.warning(f"Error in OLX scraping attempt: {str(e)}")
                             continue
                         
-                        logger.info(f"Successfully scraped OLX product: {title} - ₹{price}")
-                        return {
-                            'title': title,
-                            'description': description,
-                            'price': price,
-                            'original_price': price,
-                            'seller_name': seller_info.get('name', 'OLX Seller'),
-                            'seller_contact': seller_info.get('contact', 'Contact via OLX'),
-                            'location': location,
-                            'url': url,
-                            'platform': 'OLX',
-                            'category': self._categorize_product(title),
-                            'condition': self._extract_condition(description),
-                            'images': images,
-                            'features': features,
-                            'posted_date': posted_date,
-                            'is_available': True,
-                            'scraped_successfully': True
-                        }
-                        
-                except asyncio.TimeoutError:
-                    logger.warning(f"Timeout scraping OLX {url} (attempt {attempt + 1})")
-                    if attempt == 2:  # Last attempt
-                        logger.info("Max attempts reached, creating intelligent fallback")
-                        return self._create_fallback_product(url)
-                except Exception as e:
-                    logger.warning(f"Error in scraping attempt {attempt + 1}: {str(e)}")
-                    if attempt == 2:  # Last attempt
-                        logger.info("Max attempts reached due to error, creating intelligent fallback")
-                        return self._create_fallback_product(url)
-                
+                        if result and result.get('scraped_successfully'):
+                            return result
+                        fallback = result or fallback
+                    
+                    if not hedged:
+                        hedged = True
+                        if not throttled.is_set():
+                            pending.add(asyncio.create_task(self._fetch_olx_listing(url, 2, throttled=throttled)))
+            finally:
+                # First success wins; drop whichever attempt is still in flight
+                for task in pending:
+                    task.cancel()
+            
+            logger.info("All OLX attempts failed, creating intelligent fallback")
+            return fallback or self._create_fallback_product(url)
+            
         except Exception as e:
             error_msg = str(e) or "Unknown scraping error"
             logger.error(f"Error scraping OLX {url}: {error_msg}")
             logger.exception("Full exception details:")
             return self._create_fallback_product(url)
+    
+    async def _probe_olx_listing(self, url: str) -> bool:
+        """
+        HEAD the listing before downloading it.
+        Returns False when OLX redirects to a non-product page or the page is too large to be
+        a single listing; inconclusive probes return True so the full fetch still runs.
+        """
+        try:
+            timeout = aiohttp.ClientTimeout(total=3)
+            async with self.session.head(url, headers={'User-Agent': self._next_user_agent()},
+                                         timeout=timeout, allow_redirects=True) as response:
+                final_url = str(response.url)
+                size = int(response.headers.get('Content-Length') or 0)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.debug(f"OLX HEAD probe inconclusive for {url}: {e}")
+            return True
+        
+        if final_url != url and not self._is_valid_product_url(final_url):
+            logger.warning(f"OLX redirected {url} to non-product page {final_url}")
+            return False
+        if size > self.OLX_MAX_LISTING_BYTES:
+            logger.warning(f"OLX page too large for a single listing ({size} bytes): {url}")
+            return False
+        return True
+    
+    async def _read_olx_listing(self, response: aiohttp.ClientResponse) -> Tuple[str, Dict[str, str], bool]:
+        """
+        Read an OLX page incrementally, parsing the title, price and description elements as
+        they arrive. The whole body is read (up to MAX_HTML_BYTES) because the full extractor
+        also needs seller, location, images and features. Returns the HTML, the streamed
+        field texts and whether the page was truncated.
+        """
+        parser = etree.HTMLPullParser(events=('end',), encoding=response.charset)
+        chunks = []
+        found = {}
+        size = 0
+        truncated = False
+        
+        async for chunk in response.content.iter_chunked(8192):
+            if size + len(chunk) > MAX_HTML_BYTES:
+                chunk = chunk[:MAX_HTML_BYTES - size]
+            size += len(chunk)
+            chunks.append(chunk)
+            if len(found) < len(_OLX_STREAM_FIELDS):
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    field = _OLX_STREAM_FIELDS.get(element.get('data-aut-id'))
+                    if field and field not in found:
+                        found[field] = ''.join(element.itertext()).strip()
+            
+            if size >= MAX_HTML_BYTES:
+                logger.info(f"OLX page {response.url} truncated to {MAX_HTML_BYTES} bytes")
+                truncated = True
+                break
+        
+        html = b''.join(chunks).decode(response.charset or 'utf-8', errors='replace')
+        return html, found, truncated
+    
+    async def _fetch_olx_listing(self, url: str, attempt: int, retry: int = 0,
+                                 throttled: Optional[asyncio.Event] = None) -> Optional[Dict[str, Any]]:
+        """
+        Single OLX fetch and parse.
+        Returns the product dict, a partial fallback product when title/price are missing,
+        or None when the page could not be loaded. A throttled response sets `throttled`;
+        only the primary attempt backs off and retries, so both attempts share one budget.
+        """
+        logger.info(f"Scraping OLX attempt {attempt}: {url}")
+        timeout = aiohttp.ClientTimeout(total=8, connect=3)  # Much shorter timeout
+        
+        # Revalidate a previously scraped listing instead of re-downloading it
+        cached = self._response_cache.get(url)
+        request_headers = {'User-Agent': self._next_user_agent()}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+        
+        async with self.session.get(url, headers=request_headers, timeout=timeout) as response:
+            if response.status == 304 and cached:
+                logger.info(f"OLX listing not modified, using cached result for {url}")
+                # Callers may mutate the product dict; the cached one must stay pristine
+                return copy.deepcopy(cached[2])
+            
+            if response.status != 200:
+                logger.warning(f"OLX returned status {response.status} for {url} (attempt {attempt})")
+                if response.status in RETRYABLE_STATUSES:
+                    if throttled is not None:
+                        throttled.set()
+                    if attempt == 1 and retry < self.OLX_MAX_RETRIES:
+                        backoff = _retry_backoff(response.headers, retry)
+                        response.release()
+                        logger.info(f"Backing off {backoff:.1f}s before retrying OLX {url}")
+                        await asyncio.sleep(backoff)
+                        return await self._fetch_olx_listing(url, attempt, retry + 1, throttled)
+                return None
+            
+            if not _is_html_response(response):
+                logger.warning(f"OLX returned non-HTML content ({response.headers.get('Content-Type')}) for {url}")
+                return self._create_fallback_product(url)
+            
+            logger.debug(f"OLX response Content-Encoding: {response.headers.get('Content-Encoding')}")
+            html, streamed, truncated = await self._read_olx_listing(response)
+            tree = _make_tree(html)
+            
+            # Check if page loaded properly
+            page_title = _css_first(tree, 'title')
+            if not page_title:
+                logger.warning(f"OLX page appears to be empty for {url} (attempt {attempt})")
+                return None
+            
+            # Extract product information with fallbacks; streamed fields are used when valid
+            title = streamed.get('title')
+            if not title or not 5 < len(title) < 200 or self._is_category_title(title):
+                title = self._extract_olx_title(tree) or self._extract_title_from_url(url)
+            title = title[:100]
+            
+            price_text = streamed.get('price', '')
+            price = self._parse_price(price_text) if ('₹' in price_text or 'Rs' in price_text) else 0
+            price = price or self._extract_olx_price(tree)
+            details = self._extract_olx_all(tree)
+            description = details['description'] or "Product description not available"
+            seller_info = details['seller_info']
+            location = details['location'] or "Location not specified"
+            images = details['images']
+            features = details['features']
+            posted_date = details['posted_date']
+            
+            # Debug logging
+            logger.info(f"Extracted title: '{title}', price: ₹{price}")
+            
+            if not title or price == 0:
+                logger.warning(f"Could not extract basic info from OLX {url} (attempt {attempt})")
+                logger.info(f"Page title from HTML: {_node_text(page_title)}")
+                return self._create_fallback_product(url, title, price)
+            
+            logger.info(f"Successfully scraped OLX product: {title} - ₹{price}")
+            result = {
+                'title': title,
+                'description': description,
+                'price': price,
+                'original_price': price,
+                'seller_name': seller_info.get('name', 'OLX Seller'),
+                'seller_contact': seller_info.get('contact', 'Contact via OLX'),
+                'location': location,
+                'url': url,
+                'platform': 'OLX',
+                'category': self._categorize_product(title),
+                'condition': self._extract_condition(description),
+                'images': images,
+                'features': features,
+                'posted_date': posted_date,
+                'is_available': True,
+                'scraped_successfully': True
+            }
+            
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            # A truncated page may be missing seller/location/images, so it is never cached
+            if (etag or last_modified) and not truncated:
+                self._response_cache[url] = (etag, last_modified, copy.deepcopy(result))
+            return result
 
-    def _create_fallback_product(self, url: str, title: str = None, price: int = None) -> Dict[str, Any]:
+    def _create_fallback_product(self, url: str, title: str = None, price: int = None,
+                                 domain: str = None) -> Dict[str, Any]:
         """Create a fallback product when scraping fails"""
         extracted_title = title or self._extract_title_from_url(url)
         
@@ -220,7 +755,7 @@ class MarketplaceScraper:
         estimated_price = self._estimate_price_from_context(url, extracted_title) or price or 50000
         
         # Better platform detection
-        domain = urlparse(url).netloc.lower()
+        domain = domain or _url_domain(url)
         platform_name = 'OLX' if 'olx' in domain else 'Facebook Marketplace' if 'facebook' in domain else 'Marketplace'
         
         # Create more realistic description based on detected product type
@@ -248,9 +783,11 @@ class MarketplaceScraper:
             'note': f'AI will negotiate for this {extracted_title} based on your preferences. Product details will be confirmed during negotiation.'
         }
 
-    def _is_valid_product_url(self, url: str) -> bool:
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _is_valid_product_url(url: str, domain: str = None) -> bool:
         """Validate if URL is a valid product listing URL"""
-        domain = urlparse(url).netloc.lower()
+        domain = domain or _url_domain(url)
         
         if 'olx' in domain:
             # OLX product URLs should contain /item/ and iid-
@@ -273,21 +810,10 @@ class MarketplaceScraper:
         price = result.get('price', 0)
         
         # Check if we got redirected to a category page
-        suspicious_phrases = [
-            'buy & sell',
-            'second hand',
-            'used cars in',
-            'mobiles in',
-            'for sale',
-            'listings in',
-            'browse all'
-        ]
-        
         title_lower = title.lower()
-        for phrase in suspicious_phrases:
-            if phrase in title_lower and len(title_lower) > 50:
-                logger.warning(f"Detected category/listing page: {title}")
-                return False
+        if len(title_lower) > 50 and _has_suspicious_phrase(title_lower):
+            logger.warning(f"Detected category/listing page: {title}")
+            return False
         
         # Basic validation
         if not title or len(title) < 5:
@@ -305,27 +831,17 @@ class MarketplaceScraper:
         # The URL contains item IDs which should not be treated as prices
         
         # Price estimation based on product category keywords
-        title_lower = title.lower()
-        if any(word in title_lower for word in ['laptop', 'computer', 'macbook']):
-            return 35000
-        elif any(word in title_lower for word in ['phone', 'mobile', 'iphone', 'samsung']):
-            return 15000
-        elif any(word in title_lower for word in ['car', 'vehicle', 'auto']):
-            return 300000
-        elif any(word in title_lower for word in ['bike', 'motorcycle', 'scooter']):
-            return 80000
-        elif any(word in title_lower for word in ['furniture', 'sofa', 'table', 'chair']):
-            return 25000
-        elif any(word in title_lower for word in ['tv', 'television', 'monitor']):
-            return 20000
-        
-        return 50000  # Default fallback
-
-    def _extract_title_from_url(self, url: str) -> str:
-        """Extract a meaningful title from URL when scraping fails"""
+        category = _match_keyword_group(_PRICE_CATEGORY_RE, title.lower())
+        
+        return _PRICE_TABLE[category] if category else 50000  # Default fallback
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _extract_title_from_url(url: str) -> str:
+        """Extract a meaningful title from URL when scraping fails (memoized per URL)"""
         try:
             # Parse the URL to get meaningful parts
-            parsed = urlparse(url)
+            parsed = _cached_urlparse(url)
             path = parsed.path
             
             # For OLX URLs, extract product info from path
@@ -337,21 +853,13 @@ class MarketplaceScraper:
                 # Look for meaningful parts
                 product_info = []
                 for part in parts:
-                    if 'iphone' in part.lower():
-                        product_info.append('iPhone')
-                    elif 'samsung' in part.lower():
-                        product_info.append('Samsung Phone')
-                    elif 'mobile-phone' in part.lower():
-                        product_info.append('Mobile Phone')
-                    elif 'laptop' in part.lower():
-                        product_info.append('Laptop')
-                    elif 'bike' in part.lower():
-                        product_info.append('Bike')
-                    elif 'car' in part.lower():
-                        product_info.append('Car')
+                    part_lower = part.lower()
+                    product = _match_keyword_group(_URL_PRODUCT_RE, part_lower)
+                    if product:
+                        product_info.append(_URL_PRODUCT_LABELS[product])
                     
                     # Extract location
-                    if any(city in part.lower() for city in ['chennai', 'mumbai', 'delhi', 'bangalore', 'hyderabad', 'pune', 'kolkata']):
+                    if _CITY_RE.search(part_lower):
                         location_part = part.replace('-', ' ').title()
                         if len(location_part) > 3:
                             product_info.append(f"in {location_part}")
@@ -360,8 +868,8 @@ class MarketplaceScraper:
                     return ' '.join(product_info)
             
             # Fallback to generic extraction
-            title_parts = re.sub(r'[/_\-]', ' ', path).strip()
-            title_parts = re.sub(r'\d+', '', title_parts)  # Remove numbers
+            title_parts = _URL_SEPARATOR_RE.sub(' ', path).strip()
+            title_parts = _DIGITS_RE.sub('', title_parts)  # Remove numbers
             words = [word.capitalize() for word in title_parts.split() if len(word) > 2]
             
             # Filter out common URL words
@@ -373,7 +881,7 @@ class MarketplaceScraper:
             logger.warning(f"Error extracting title from URL: {e}")
             return "Marketplace Product"
     
-    def _extract_olx_title(self, soup: BeautifulSoup) -> str:
+    def _extract_olx_title(self, tree: Any) -> str:
         """Extract product title from OLX with multiple fallback strategies"""
         # Updated selectors for current OLX structure
         selectors = [
@@ -388,9 +896,9 @@ class MarketplaceScraper:
         ]
         
         for selector in selectors:
-            elements = soup.select(selector)
+            elements = _css(tree, selector)
             for element in elements:
-                title = element.get_text(strip=True)
+                title = _node_text(element)
                 # Validate title - should not be category page indicators
                 if (title and len(title) > 5 and len(title) < 200 and 
                     not self._is_category_title(title)):
@@ -398,18 +906,18 @@ class MarketplaceScraper:
                     return title[:100]  # Limit length
         
         # Try meta title as fallback
-        meta_title = soup.find('meta', property='og:title')
-        if meta_title and meta_title.get('content'):
-            title = meta_title.get('content')
+        meta_title = _css_first(tree, 'meta[property="og:title"]')
+        if meta_title and _node_attr(meta_title, 'content'):
+            title = _node_attr(meta_title, 'content')
             if not self._is_category_title(title):
                 return title[:100]
         
         # Try page title as last resort
-        title_tag = soup.find('title')
+        title_tag = _css_first(tree, 'title')
         if title_tag:
-            title = title_tag.get_text(strip=True)
+            title = _node_text(title_tag)
             # Extract product name from page title
-            title = re.sub(r'\s*\|\s*OLX.*$', '', title)  # Remove " | OLX..." suffix
+            title = _OLX_TITLE_SUFFIX_RE.sub('', title)  # Remove " | OLX..." suffix
             if not self._is_category_title(title) and len(title) > 5:
                 return title[:100]
         
@@ -417,24 +925,9 @@ class MarketplaceScraper:
     
     def _is_category_title(self, title: str) -> bool:
         """Check if title indicates a category/listing page rather than product page"""
-        title_lower = title.lower()
-        category_indicators = [
-            'buy & sell',
-            'second hand',
-            'used cars in',
-            'mobiles in',
-            'bikes in',
-            'for sale',
-            'listings in',
-            'browse all',
-            'find ads',
-            'classified',
-            'olx.in'
-        ]
-        
-        return any(indicator in title_lower for indicator in category_indicators)
+        return _has_category_indicator(title.lower())
     
-    def _extract_olx_price(self, soup: BeautifulSoup) -> int:
+    def _extract_olx_price(self, tree: Any) -> int:
         """Extract price from OLX listing prioritizing rupee symbol"""
         # PRIORITY 1: OLX-specific price selectors
         priority_selectors = [
@@ -456,9 +949,9 @@ class MarketplaceScraper:
         
         # PRIORITY 1: Try OLX-specific selectors first
         for selector in priority_selectors:
-            elements = soup.select(selector)
+            elements = _css(tree, selector)
             for element in elements:
-                price_text = element.get_text(strip=True)
+                price_text = _node_text(element)
                 if price_text and ('₹' in price_text or 'Rs' in price_text):
                     price = self._parse_price(price_text)
                     if price > 0:
@@ -467,9 +960,9 @@ class MarketplaceScraper:
         
         # PRIORITY 2: Try secondary selectors
         for selector in secondary_selectors:
-            elements = soup.select(selector)
+            elements = _css(tree, selector)
             for element in elements:
-                price_text = element.get_text(strip=True)
+                price_text = _node_text(element)
                 if price_text:
                     price = self._parse_price(price_text)
                     if price > 0:
@@ -477,10 +970,10 @@ class MarketplaceScraper:
                         return price
         
         # Search for price in structured data (JSON-LD)
-        json_scripts = soup.find_all('script', type='application/ld+json')
+        json_scripts = _css(tree, 'script[type="application/ld+json"]')
         for script in json_scripts:
             try:
-                data = json.loads(script.string)
+                data = orjson.loads(script.text() if _is_lexbor(script) else str(script.string))
                 if isinstance(data, dict) and 'offers' in data:
                     offers = data['offers']
                     if isinstance(offers, dict) and 'price' in offers:
@@ -488,13 +981,15 @@ class MarketplaceScraper:
                         if price > 0:
                             logger.info(f"Found price in JSON-LD: ₹{price}")
                             return price
-            except (json.JSONDecodeError, ValueError, KeyError):
+            except (orjson.JSONDecodeError, ValueError, KeyError, TypeError):
                 continue
         
         # Last resort: search all text but be more selective
-        price_containers = soup.find_all(['div', 'span'], class_=re.compile(r'price|cost|amount'))
+        price_containers = _css(tree, ', '.join(
+            f'{tag}[class*="{word}"]' for word in ('price', 'cost', 'amount') for tag in ('div', 'span')
+        ))
         for container in price_containers:
-            price_text = container.get_text(strip=True)
+            price_text = _node_text(container)
             price = self._parse_price(price_text)
             if price > 0:
                 logger.info(f"Found price in price container: ₹{price}")
@@ -508,17 +1003,11 @@ class MarketplaceScraper:
             return 0
             
         # Remove common non-price text but preserve rupee symbols
-        text = re.sub(r'(per|month|year|day|week)', '', text, flags=re.IGNORECASE)
+        text = _PRICE_NOISE_RE.sub('', text)
         
         # PRIORITY 1: Indian Rupee symbol patterns (₹)
-        rupee_patterns = [
-            r'₹\s*(\d+(?:,\d+)*(?:\.\d+)?)',      # ₹50,000 or ₹50000.00
-            r'₹\s*(\d+(?:\.\d+)?)\s*(?:lakh|lac)', # ₹5.5 lakh
-            r'₹\s*(\d+(?:\.\d+)?)\s*(?:crore)',    # ₹1.2 crore
-        ]
-        
-        for pattern in rupee_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _RUPEE_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 try:
                     price_str = match.replace(',', '')
@@ -540,23 +1029,15 @@ class MarketplaceScraper:
                     continue
         
         # PRIORITY 2: Alternative Indian currency formats
-        alt_patterns = [
-            r'Rs\.?\s*(\d+(?:,\d+)*)',            # Rs.50000 or Rs. 50,000
-            r'INR\s*(\d+(?:,\d+)*)',              # INR 50000
-            r'rupees?\s*(\d+(?:,\d+)*)',          # rupees 50000
-            r'(\d+(?:\.\d+)?)\s*lakh',            # 5 lakh or 5.5 lakh
-            r'(\d+(?:\.\d+)?)\s*crore',           # 2 crore or 2.5 crore
-        ]
-        
-        for pattern in alt_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _ALT_PRICE_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 try:
                     # Handle lakh/crore conversion
-                    if 'lakh' in pattern:
+                    if 'lakh' in pattern.pattern:
                         price = int(float(match) * 100000)  # Convert lakh to number
                         logger.info(f"Found price in lakh: ₹{price:,}")
-                    elif 'crore' in pattern:
+                    elif 'crore' in pattern.pattern:
                         price = int(float(match) * 10000000)  # Convert crore to number
                         logger.info(f"Found price in crore: ₹{price:,}")
                     else:
@@ -570,13 +1051,8 @@ class MarketplaceScraper:
         
         # PRIORITY 3: Numbers only (be more selective to avoid IDs)
         # Only consider numbers that appear in price-like contexts
-        number_patterns = [
-            r'(?:price|cost|amount|value|worth)[\s:]*(\d{3,}(?:,\d+)*)',  # "Price: 50000"
-            r'(\d{3,}(?:,\d+)*)\s*(?:only|/-|/\-)',                      # "50000 only" or "50000/-"
-        ]
-        
-        for pattern in number_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _NUMBER_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 try:
                     price = int(match.replace(',', ''))
@@ -589,127 +1065,55 @@ class MarketplaceScraper:
         
         return 0
     
-    def _extract_olx_description(self, soup: BeautifulSoup) -> str:
-        """Extract product description from OLX"""
-        selectors = [
-            '[data-aut-id="itemDescriptionText"]',
-            '.description-text',
-            '.ad-description'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                return element.get_text(strip=True)
-        
-        return ""
-    
-    def _extract_olx_seller(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """Extract seller information from OLX"""
-        seller_info = {'name': 'Unknown', 'contact': ''}
-        
-        # Try to find seller name
-        name_selectors = [
-            '[data-aut-id="profileName"]',
-            '.seller-name',
-            '.profile-name'
-        ]
-        
-        for selector in name_selectors:
-            element = soup.select_one(selector)
-            if element:
-                seller_info['name'] = element.get_text(strip=True)
+    def _extract_olx_all(self, tree: Any) -> Dict[str, Any]:
+        """
+        Extract the secondary OLX fields (description, seller, location, images,
+        features, posted date) with one selector-group query per field
+        """
+        description = _css_first(tree, _OLX_DESCRIPTION_SELECTOR)
+        seller_name = _css_first(tree, _OLX_SELLER_NAME_SELECTOR)
+        location = _css_first(tree, _OLX_LOCATION_SELECTOR)
+        posted = _css_first(tree, _OLX_DATE_SELECTOR)
+        
+        # Contact is usually hidden behind interaction; take the first tel: link
+        contact = ''
+        for element in _css(tree, _OLX_CONTACT_SELECTOR):
+            href = _node_attr(element, 'href')
+            tel_match = _TEL_RE.search(href) if href else None
+            if tel_match:
+                contact = tel_match.group(1)
                 break
         
-        # Try to find contact (usually hidden, may need interaction)
-        contact_selectors = [
-            '[data-aut-id="chatButton"]',
-            '.contact-number',
-            '.seller-phone'
-        ]
-        
-        for selector in contact_selectors:
-            element = soup.select_one(selector)
-            if element and 'href' in element.attrs:
-                # Extract phone from tel: link
-                tel_match = re.search(r'tel:(\d+)', element['href'])
-                if tel_match:
-                    seller_info['contact'] = tel_match.group(1)
+        # Ordered dedupe with a companion set; stop once the caps are reached
+        images, seen = [], set()
+        for img in _css(tree, _OLX_IMAGE_SELECTOR):
+            src = _node_attr(img, 'src') or _node_attr(img, 'data-src')
+            if src and src not in seen:
+                seen.add(src)
+                images.append(src)
+                if len(images) >= 5:
                     break
         
-        return seller_info
-    
-    def _extract_olx_location(self, soup: BeautifulSoup) -> str:
-        """Extract location from OLX listing"""
-        selectors = [
-            '[data-aut-id="itemLocation"]',
-            '.location-text',
-            '.ad-location'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                return element.get_text(strip=True)
-        
-        return "Unknown Location"
-    
-    def _extract_olx_images(self, soup: BeautifulSoup) -> List[str]:
-        """Extract product images from OLX"""
-        images = []
-        
-        # Look for image elements
-        img_selectors = [
-            '.gallery-image img',
-            '.image-gallery img',
-            '[data-aut-id="defaultImg"]'
-        ]
-        
-        for selector in img_selectors:
-            elements = soup.select(selector)
-            for img in elements:
-                src = img.get('src') or img.get('data-src')
-                if src and src not in images:
-                    images.append(src)
-        
-        return images[:5]  # Limit to 5 images
-    
-    def _extract_olx_features(self, soup: BeautifulSoup) -> List[str]:
-        """Extract product features/specifications from OLX"""
-        features = []
-        
-        # Look for feature lists
-        feature_selectors = [
-            '.features-list li',
-            '.specifications li',
-            '.details-list li'
-        ]
-        
-        for selector in feature_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                feature_text = element.get_text(strip=True)
-                if feature_text and feature_text not in features:
-                    features.append(feature_text)
-        
-        return features[:10]  # Limit to 10 features
-    
-    def _extract_olx_date(self, soup: BeautifulSoup) -> datetime:
-        """Extract posting date from OLX"""
-        date_selectors = [
-            '[data-aut-id="itemCreationDate"]',
-            '.post-date',
-            '.ad-date'
-        ]
-        
-        for selector in date_selectors:
-            element = soup.select_one(selector)
-            if element:
-                date_text = element.get_text(strip=True)
-                # Parse various date formats
-                return self._parse_date(date_text)
+        features, seen = [], set()
+        for element in _css(tree, _OLX_FEATURE_SELECTOR):
+            feature_text = _node_text(element)
+            if feature_text and feature_text not in seen:
+                seen.add(feature_text)
+                features.append(feature_text)
+                if len(features) >= 10:
+                    break
         
-        return datetime.now()  # Default to current date
+        return {
+            'description': _node_text(description) if description else "",
+            'seller_info': {
+                'name': _node_text(seller_name) if seller_name else 'Unknown',
+                'contact': contact
+            },
+            'location': _node_text(location) if location else "Unknown Location",
+            'images': images,  # At most 5 images
+            'features': features,  # At most 10 features
+            'posted_date': self._parse_date(_node_text(posted)) if posted else datetime.now()
+        }
     
     async def _scrape_facebook(self, url: str) -> Optional[Dict[str, Any]]:
         """Scrape Facebook Marketplace listing"""
@@ -720,16 +1124,13 @@ class MarketplaceScraper:
         # 3. Proxy rotation
         
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
+            async with self.session.get(url, headers={'User-Agent': self._next_user_agent()}) as response:
+                if response.status != 200 or not _is_html_response(response):
                     return None
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
                 # Basic extraction (limited due to Facebook's dynamic content)
-                title = soup.find('title')
-                title_text = title.get_text() if title else "Facebook Marketplace Item"
+                title = (await _stream_elements(response, ('title',))).get('title')
+                title_text = _element_text(title, strip=False) if title is not None else "Facebook Marketplace Item"
                 
                 return {
                     'title': title_text,
@@ -757,16 +1158,13 @@ class MarketplaceScraper:
         """Scrape Quikr listing"""
         # Similar implementation to OLX but with Quikr-specific selectors
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
+            async with self.session.get(url, headers={'User-Agent': self._next_user_agent()}) as response:
+                if response.status != 200 or not _is_html_response(response):
                     return None
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
                 # Extract basic information
-                title = soup.find('h1')
-                title_text = title.get_text(strip=True) if title else "Quikr Item"
+                title = (await _stream_elements(response, ('h1',))).get('h1')
+                title_text = _element_text(title) if title is not None else "Quikr Item"
                 
                 return {
                     'title': title_text,
@@ -793,19 +1191,21 @@ class MarketplaceScraper:
     async def _scrape_generic(self, url: str) -> Optional[Dict[str, Any]]:
         """Generic scraper for unknown marketplaces"""
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
+            async with self.session.get(url, headers={'User-Agent': self._next_user_agent()}) as response:
+                if response.status != 200 or not _is_html_response(response):
                     return None
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                # Extract basic meta information; both live in <head>, so stop reading there
+                found = await _stream_elements(
+                    response, ('title', 'meta'),
+                    accept=lambda element: element.tag != 'meta' or element.get('name') == 'description',
+                    until='head'
+                )
+                title = found.get('title')
+                title_text = _element_text(title) if title is not None else "Marketplace Item"
                 
-                # Extract basic meta information
-                title = soup.find('title')
-                title_text = title.get_text(strip=True) if title else "Marketplace Item"
-                
-                description = soup.find('meta', attrs={'name': 'description'})
-                desc_text = description.get('content', '') if description else ""
+                description = found.get('meta')
+                desc_text = description.get('content', '') if description is not None else ""
                 
                 return {
                     'title': title_text,
@@ -816,7 +1216,7 @@ class MarketplaceScraper:
                     'seller_contact': '',
                     'location': 'Unknown',
                     'url': url,
-                    'platform': urlparse(url).netloc,
+                    'platform': _cached_urlparse(url).netloc,
                     'category': 'Unknown',
                     'condition': 'Unknown',
                     'images': [],
@@ -829,76 +1229,253 @@ class MarketplaceScraper:
             logger.error(f"Error with generic scraper {url}: {e}")
             return None
     
-    def _categorize_product(self, title: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _categorize_product(title: str) -> str:
         """Categorize product based on title keywords"""
-        title_lower = title.lower()
-        
-        # Electronics
-        if any(word in title_lower for word in ['iphone', 'samsung', 'mobile', 'phone', 'smartphone']):
-            return 'Mobile Phones'
-        elif any(word in title_lower for word in ['laptop', 'macbook', 'computer', 'pc']):
-            return 'Laptops & Computers'
-        elif any(word in title_lower for word in ['tv', 'television', 'led', 'lcd']):
-            return 'Electronics'
-        
-        # Vehicles
-        elif any(word in title_lower for word in ['car', 'honda', 'maruti', 'hyundai', 'tata']):
-            return 'Cars'
-        elif any(word in title_lower for word in ['bike', 'motorcycle', 'activa', 'scooty']):
-            return 'Vehicles'
-        
-        # Gaming
-        elif any(word in title_lower for word in ['ps5', 'xbox', 'playstation', 'nintendo']):
-            return 'Gaming'
-        
-        # Home & Garden
-        elif any(word in title_lower for word in ['furniture', 'sofa', 'bed', 'table']):
-            return 'Home & Garden'
-        
-        return 'Other'
+        category = _match_keyword_group(_CATEGORY_RE, title.lower())
+        return _CATEGORY_LABELS[category] if category else 'Other'
     
-    def _extract_condition(self, description: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _extract_condition(description: str) -> str:
         """Extract product condition from description"""
-        desc_lower = description.lower()
-        
-        if any(word in desc_lower for word in ['excellent', 'perfect', 'like new', 'mint']):
-            return 'Excellent'
-        elif any(word in desc_lower for word in ['good', 'working', 'fine']):
-            return 'Good'
-        elif any(word in desc_lower for word in ['fair', 'used', 'normal wear']):
-            return 'Fair'
-        elif any(word in desc_lower for word in ['poor', 'damaged', 'broken']):
-            return 'Poor'
-        
-        return 'Good'  # Default
+        return _match_keyword_group(_CONDITION_RE, description.lower()) or 'Good'  # Default
     
     def _parse_date(self, date_text: str) -> datetime:
         """Parse various date formats"""
         try:
             date_lower = date_text.lower().strip()
             
+            # Relative dates resolve to a day offset; the clock is read once, at return
             if 'today' in date_lower or 'just now' in date_lower:
-                return datetime.now()
+                days_ago = 0
             elif 'yesterday' in date_lower:
-                return datetime.now().replace(day=datetime.now().day - 1)
-            elif 'days ago' in date_lower:
-                days_match = re.search(r'(\d+)\s*days?\s*ago', date_lower)
-                if days_match:
-                    days = int(days_match.group(1))
-                    return datetime.now().replace(day=datetime.now().day - days)
+                days_ago = 1
+            else:
+                days_match = _DAYS_AGO_RE.search(date_lower)
+                days_ago = int(days_match.group(1)) if days_match else None
             
-            # Try standard date formats
-            for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']:
-                try:
-                    return datetime.strptime(date_text, fmt)
-                except ValueError:
-                    continue
+            if days_ago is None:
+                # Absolute dates don't depend on the current time, so they are memoized
+                parsed = _parse_absolute_date(date_lower)
+                if parsed:
+                    return parsed
+            elif days_ago:
+                return datetime.now() - timedelta(days=days_ago)
             
         except Exception:
             pass
         
-        return datetime.now()  # Fallback
+        return datetime.now()  # Today, or fallback
+
+
+@dataclass(frozen=True)
+class ProductContext:
+    """Lower-cased product text and its listing keyword hits, computed once per analysis"""
+    title_lower: str
+    desc_lower: str
+    title_keywords: Set[str]
+    desc_keywords: Set[str]
+    desc_tokens: FrozenSet[str]
+    
+    @classmethod
+    def from_product(cls, product_data: Dict[str, Any]) -> 'ProductContext':
+        title_lower = (product_data.get('title') or '').lower()
+        desc_lower = (product_data.get('description') or '').lower()
+        return cls(
+            title_lower=title_lower,
+            desc_lower=desc_lower,
+            title_keywords=_scan_listing_keywords(title_lower),
+            desc_keywords=_scan_listing_keywords(desc_lower),
+            desc_tokens=frozenset(_WORD_RE.findall(desc_lower))
+        )
+
+# Price range assumed for categories missing from category_price_ranges
+_DEFAULT_CATEGORY_RANGE = {'min': 1000, 'max': 100000, 'depreciation': 0.2}
+
+# Brand/tier multipliers for market value in percent, checked in order (first match wins)
+_PREMIUM_MULTIPLIERS = (
+    ('apple', 130), ('iphone', 130), ('macbook', 140),
+    ('samsung', 120), ('sony', 120), ('lg', 110),
+    ('mercedes', 150), ('bmw', 140), ('audi', 140),
+    ('premium', 120), ('pro', 115), ('plus', 110)
+)
+
+# Age hints in titles and their value factors in percent, checked in order
+_AGE_FACTORS = (
+    ('2024', 95), ('2023', 85), ('2022', 75), ('2021', 65),
+    ('new', 100), ('old', 70), ('vintage', 50)
+)
+
+# Model years recognised in titles for depreciation, oldest first
+_CURRENT_MODEL_YEAR = 2025
+_MODEL_YEARS = tuple(str(year) for year in range(2020, _CURRENT_MODEL_YEAR + 1))
+
+# One pass over a title finds every brand, age hint and model year; memoized because
+# _estimate_market_value and _calculate_depreciation scan the same title
+_scan_title_keywords = functools.lru_cache(maxsize=4096)(_build_keyword_scanner(list(dict.fromkeys(
+    [brand for brand, _ in _PREMIUM_MULTIPLIERS] + [keyword for keyword, _ in _AGE_FACTORS] + list(_MODEL_YEARS)
+))))
 
+@functools.lru_cache(maxsize=4096)
+def _estimate_market_value(title_lower: str, category_min: int, category_max: int, current_price: int) -> int:
+    """Estimate market value from the category range, title keywords and asking price"""
+    # Base estimation on category median; integer arithmetic throughout, factors are percentages
+    category_median = (category_min + category_max) // 2
+    
+    # Adjust based on title keywords
+    found = _scan_title_keywords(title_lower)
+    
+    # Premium brand multiplier; the first keyword in table order wins
+    multiplier = next((mult for brand, mult in _PREMIUM_MULTIPLIERS if brand in found), 100)
+    
+    # Age-based depreciation estimation
+    age_factor = next((factor for keyword, factor in _AGE_FACTORS if keyword in found), 80)
+    
+    # Calculate estimated value
+    estimated_value = category_median * multiplier * age_factor // 10000
+    
+    # If current price is reasonable, blend with it
+    if category_min <= current_price <= category_max * 1.5:
+        estimated_value = int(estimated_value + current_price) // 2
+    
+    return max(category_min, min(estimated_value, category_max))
+
+def _market_scores(current_price: float, estimated_value: float) -> Tuple[str, float]:
+    """Market position and negotiation potential from one price/estimate ratio"""
+    if estimated_value <= 0:
+        return "market_average", 0.15  # Ratio treated as 1; default 15% potential
+    
+    ratio = current_price / estimated_value
+    if ratio > 1.3:
+        position = "premium_priced"
+    elif ratio > 1.1:
+        position = "above_market"
+    elif ratio < 0.8:
+        position = "below_market"
+    elif ratio < 0.9:
+        position = "competitive"
+    else:
+        position = "market_average"
+    
+    # Base negotiation potential: 10-30% depending on overpricing
+    overpricing = max(0, (current_price - estimated_value) / estimated_value)
+    return position, min(0.1 + overpricing * 0.5, 0.3)
+
+def _confidence_score(negotiation_potential: float, positive_count: int, negative_count: int) -> float:
+    """Overall analysis confidence from price and condition signal strength"""
+    # Base confidence factors
+    price_confidence = 0.7  # Moderate confidence in price analysis
+    condition_confidence = 0.8 if positive_count or negative_count else 0.6
+    market_confidence = 0.6  # Limited market data confidence
+    
+    # Adjust based on available data quality
+    if negotiation_potential > 0.2:
+        price_confidence += 0.1
+    if positive_count > 2:
+        condition_confidence += 0.1
+    
+    overall_confidence = (price_confidence * 0.4 + condition_confidence * 0.3 + market_confidence * 0.3)
+    return min(0.95, max(0.3, overall_confidence))  # Clamp between 30% and 95%
+
+@functools.lru_cache(maxsize=4096)
+def _calculate_depreciation(title_lower: str, base_depreciation: float) -> float:
+    """Depreciation factor from the earliest model year in the title"""
+    found = _scan_title_keywords(title_lower)
+    year = next((year for year in _MODEL_YEARS if year in found), None)
+    if year:
+        age = _CURRENT_MODEL_YEAR - int(year)
+        return min(base_depreciation * age, 0.8)  # Max 80% depreciation
+    
+    # Default depreciation for used items
+    return base_depreciation * 2  # Assume 2 years old if no year mentioned
+
+# Whole words that count as disclosed defects in risk assessment; matched as tokens so
+# e.g. "unbroken" or "no problemo" don't flag a defect
+_DEFECT_WORDS = frozenset({'damaged', 'broken', 'issue', 'issues', 'problem', 'problems'})
+_WORD_RE = re.compile(r'\w+')
+
+_PRE_NEGOTIATION_ACTIONS = (
+    "Research similar products in your area for comparison",
+    "Prepare list of questions about product condition and history",
+)
+
+_FALLBACK_FOLLOW_UP_ACTIONS = (
+    "Verify product condition",
+    "Complete transaction quickly if price agreed",
+)
+
+_APPROACH_HIGH = "Approach with confidence - analysis shows favorable negotiation position"
+_APPROACH_LOW = "Proceed cautiously - consider if this is the right deal for you"
+_ADDRESS_CONCERNS = "Address condition concerns early in negotiation"
+
+def _price_bucket(price_vs_estimate: float) -> str:
+    """Pricing insight for a price's percentage difference from the estimate"""
+    if price_vs_estimate > 25:
+        return "Significantly overpriced - strong negotiation potential"
+    if price_vs_estimate > 10:
+        return "Moderately overpriced - good negotiation room"
+    if price_vs_estimate < -10:
+        return "Below market value - may indicate urgency or condition issues"
+    return "Reasonably priced according to market standards"
+
+def _category_bucket(current_price: int, category_min: int, category_max: int) -> Optional[str]:
+    """Insight on where a price sits within its category range, if at either end"""
+    if current_price < category_min * 1.2:
+        return "Price at lower end of category range"
+    if current_price > category_max * 0.8:
+        return "Price at higher end of category range"
+    return None
+
+_MITIGATION_STRATEGIES = (
+    "Request additional photos and detailed condition report",
+    "Arrange physical inspection before finalizing",
+    "Verify seller credentials and product authenticity",
+    "Factor in potential repair/replacement costs",
+    "Set clear terms for transaction and handover",
+)
+
+# Talking points for the fallback analysis; filled in with str.format at call time
+_FALLBACK_OPENING = "I'm interested in this {category}"
+_FALLBACK_JUSTIFY = "My budget is around {target}"
+_FALLBACK_CLOSING = "I can offer {target} for immediate purchase"
+_FALLBACK_START = "Start negotiation at {target}"
+_FALLBACK_KEY_TACTICS = ('cash_buyer_advantage', 'immediate_closure')
+_FALLBACK_MITIGATION = ('Verify product condition before purchase',)
+
+# Product fields used when analysis is requested without usable product data
+_PRODUCT_FALLBACK_TEMPLATE = {
+    'title': 'Unknown Product',
+    'category': 'Other',
+    'condition': 'Good',
+    'location': 'Unknown',
+    'description': 'Product description not available'
+}
+
+# Fixed talking points shared by every generated negotiation brief
+_URGENCY_POINTS = (
+    "I can proceed immediately if we can agree on a fair price",
+    "I understand you're looking for a quick sale",
+)
+_VALUE_PROPOSITIONS = (
+    "I'm a serious buyer with cash ready",
+    "No financing delays or complications",
+    "Can complete the transaction quickly",
+)
+_CLOSING_TAIL = (
+    "This is a fair offer considering the current market conditions",
+    "Let me know if this works for you",
+)
+
+def _price_comparison(current_price: float, category_min: float, category_max: float,
+                      estimated_value: float) -> Dict[str, float]:
+    """Percentage difference of the price from the category bounds and the estimated value"""
+    return {
+        'vs_category_min': (current_price - category_min) / category_min * 100,
+        'vs_category_max': (current_price - category_max) / category_max * 100,
+        'vs_estimated_value': (current_price - estimated_value) / estimated_value * 100
+    }
 
 class MarketIntelligence:
     """Enhanced market intelligence gathering for comprehensive product analysis"""
@@ -914,6 +1491,91 @@ class MarketIntelligence:
             'Gaming': {'min': 5000, 'max': 80000, 'depreciation': 0.2},
             'Home & Garden': {'min': 1000, 'max': 150000, 'depreciation': 0.1}
         }
+        # (normalized title, category, price) -> market analysis; the analysis is deterministic
+        self._market_price_cache = LRUCache(maxsize=2048)
+        self._fallback_analysis_cache = LRUCache(maxsize=1024)
+        self._build_category_arrays()
+    
+    def _build_category_arrays(self):
+        """
+        Structure-of-arrays view of category_price_ranges for batch scoring.
+        The last row holds the defaults used for unknown categories (index -1).
+        """
+        categories = list(self.category_price_ranges)
+        ranges = [self.category_price_ranges[c] for c in categories] + [_DEFAULT_CATEGORY_RANGE]
+        self._category_index = {category: i for i, category in enumerate(categories)}
+        self._category_min = np.array([r['min'] for r in ranges], dtype=np.float64)
+        self._category_max = np.array([r['max'] for r in ranges], dtype=np.float64)
+        self._category_depreciation = np.array([r['depreciation'] for r in ranges], dtype=np.float64)
+    
+    def batch_price_comparison(self, categories: List[str], prices: List[int],
+                               estimated_values: List[int]) -> Dict[str, np.ndarray]:
+        """Vectorized price_comparison for a shortlist of products (one value per product)"""
+        idx = np.fromiter((self._category_index.get(c, -1) for c in categories),
+                          dtype=np.intp, count=len(categories))
+        prices = np.asarray(prices, dtype=np.float64)
+        estimated = np.asarray(estimated_values, dtype=np.float64)
+        mins = self._category_min[idx]
+        maxs = self._category_max[idx]
+        return {
+            'vs_category_min': (prices - mins) / mins * 100,
+            'vs_category_max': (prices - maxs) / maxs * 100,
+            'vs_estimated_value': (prices - estimated) / estimated * 100
+        }
+    
+    def clear_market_price_cache(self):
+        """Drop memoized market price analyses (e.g. after editing category_price_ranges)"""
+        self._market_price_cache.clear()
+        self._fallback_analysis_cache.clear()
+        # The batch arrays are derived from category_price_ranges too
+        self._build_category_arrays()
+    
+    def analyze_many(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Market price analysis for a batch of products (e.g. a page of search results).
+        Produces the same dicts as analyze_market_price, with the ratio, position and
+        negotiation-potential arithmetic done as NumPy array operations.
+        """
+        if not products:
+            return []
+        
+        titles = [p.get('title', 'Unknown Product') for p in products]
+        categories = [p.get('category', 'Other') for p in products]
+        prices = np.fromiter((p.get('price', 0) for p in products), dtype=np.float64, count=len(products))
+        category_infos = [self.category_price_ranges.get(c, _DEFAULT_CATEGORY_RANGE) for c in categories]
+        estimated = np.fromiter(
+            (self._estimate_market_value(t, c, int(price)) for t, c, price in zip(titles, categories, prices)),
+            dtype=np.float64, count=len(products)
+        )
+        
+        comparisons = self.batch_price_comparison(categories, prices, estimated)
+        has_estimate = estimated > 0
+        safe_estimated = np.where(has_estimate, estimated, 1.0)
+        ratios = np.where(has_estimate, prices / safe_estimated, 1.0)
+        positions = np.select(
+            [ratios > 1.3, ratios > 1.1, ratios < 0.8, ratios < 0.9],
+            ['premium_priced', 'above_market', 'below_market', 'competitive'],
+            default='market_average'
+        )
+        overpricing = np.maximum(0, (prices - estimated) / safe_estimated)
+        potentials = np.where(has_estimate, np.minimum(0.1 + overpricing * 0.5, 0.3), 0.15)
+        
+        comparison_rows = zip(*(comparisons[key].tolist() for key in comparisons))
+        return [
+            {
+                'estimated_market_value': int(estimate),
+                'category_price_range': info,
+                'price_comparison': dict(zip(comparisons, row)),
+                'depreciation_factor': self._calculate_depreciation(title, category),
+                'price_insights': self._analyze_pricing_patterns(int(price), int(estimate), info),
+                'market_position': str(position),
+                'negotiation_potential': potential
+            }
+            for title, category, info, price, estimate, row, position, potential in zip(
+                titles, categories, category_infos, prices.tolist(), estimated.tolist(),
+                comparison_rows, positions.tolist(), potentials.tolist()
+            )
+        ]
     
     async def comprehensive_product_analysis(self, product_data: Dict[str, Any], user_target: int, user_budget: int) -> Dict[str, Any]:
         """
@@ -922,59 +1584,36 @@ class MarketIntelligence:
         """
         logger.debug(f"Starting comprehensive analysis with product_data type: {type(product_data)}")
         
-        # Robust input validation
-        if product_data is None:
-            logger.warning("product_data is None, creating fallback")
-            product_data = {
-                'title': 'Unknown Product',
-                'price': user_budget if user_budget > 0 else 10000,
-                'category': 'Other',
-                'condition': 'Good',
-                'location': 'Unknown',
-                'description': 'Product description not available'
-            }
-        elif not isinstance(product_data, dict):
-            logger.warning(f"product_data is not a dict (type: {type(product_data)}), creating fallback")
-            product_data = {
-                'title': 'Unknown Product',
-                'price': user_budget if user_budget > 0 else 10000,
-                'category': 'Other',
-                'condition': 'Good',
-                'location': 'Unknown',
-                'description': 'Product description not available'
-            }
-        elif not product_data:  # Empty dict
-            logger.warning("product_data is empty dict, creating fallback")
-            product_data = {
-                'title': 'Unknown Product',
-                'price': user_budget if user_budget > 0 else 10000,
-                'category': 'Other',
-                'condition': 'Good',
-                'location': 'Unknown',
-                'description': 'Product description not available'
-            }
+        # Robust input validation: None, non-dict and empty dict all get the fallback product
+        if not isinstance(product_data, dict) or not product_data:
+            logger.warning(f"product_data is empty or not a dict (type: {type(product_data)}), creating fallback")
+            product_data = {**_PRODUCT_FALLBACK_TEMPLATE, 'price': user_budget if user_budget > 0 else 10000}
+        
+        # Plain lookups on a dict; these cannot raise, so they stay outside the try
+        title = product_data.get('title', 'Unknown Product')
+        price = product_data.get('price', user_budget if user_budget > 0 else 10000)
+        category = product_data.get('category', 'Other')
+        condition = product_data.get('condition', 'Good')
+        description = product_data.get('description', 'Product description not available')
         
         try:
+            # Lower-case and keyword-scan title and description once for every step below
+            ctx = ProductContext.from_product(product_data)
             
-            title = product_data.get('title', 'Unknown Product')
-            price = product_data.get('price', user_budget if user_budget > 0 else 10000)
-            category = product_data.get('category', 'Other')
-            condition = product_data.get('condition', 'Good')
-            location = product_data.get('location', 'Unknown')
-            description = product_data.get('description', 'Product description not available')
-            
-            # 1. Market Price Analysis
-            market_analysis = await self.analyze_market_price(title, category, price)
-            
-            # 2. Product Condition Assessment  
-            condition_analysis = self._analyze_product_condition(description, condition, price)
+            # 1. Market Price Analysis and 2. Product Condition Assessment are independent;
+            # the condition scan runs in the default executor so the event loop stays free
+            loop = asyncio.get_running_loop()
+            market_analysis, condition_analysis = await asyncio.gather(
+                self.analyze_market_price(title, category, price),
+                loop.run_in_executor(None, self._analyze_product_condition, description, condition, price, ctx)
+            )
             
             # 3. Price Justification Analysis
-            price_justification = self._analyze_price_justification(product_data, market_analysis)
+            price_justification = self._analyze_price_justification(product_data, market_analysis, ctx)
             
             # 4. Generate Negotiation Talking Points
             talking_points = self._generate_negotiation_points(
-                product_data, market_analysis, condition_analysis, user_target, user_budget
+                product_data, market_analysis, condition_analysis, user_target, user_budget, ctx
             )
             
             # 5. Strategic Recommendations
@@ -983,7 +1622,7 @@ class MarketIntelligence:
             )
             
             # 6. Risk Assessment
-            risk_analysis = self._assess_negotiation_risks(product_data, market_analysis)
+            risk_analysis = self._assess_negotiation_risks(product_data, market_analysis, ctx)
             
             return {
                 'market_analysis': market_analysis,
@@ -1001,38 +1640,20 @@ class MarketIntelligence:
             logger.error(f"Error type: {type(e).__name__}")
             logger.error(f"Error details: {str(e)}")
             
-            # Create fallback using product_data parameter (which is guaranteed to exist)
-            try:
-                # Safely access product_data parameter
-                fallback_product_data = product_data if (product_data and isinstance(product_data, dict)) else {
-                    'title': 'Unknown Product',
-                    'price': user_budget if user_budget > 0 else 10000,
-                    'category': 'Other',
-                    'condition': 'Good',
-                    'location': 'Unknown',
-                    'description': 'Product description not available'
-                }
-            except NameError as ne:
-                logger.error(f"NameError accessing product_data in fallback: {ne}")
-                # This should never happen since product_data is a method parameter
-                fallback_product_data = {
-                    'title': 'Emergency Fallback Product',
-                    'price': user_budget if user_budget > 0 else 10000,
-                    'category': 'Other',
-                    'condition': 'Good',
-                    'location': 'Unknown',
-                    'description': 'Emergency fallback due to scope issue'
-                }
-            
-            return self._get_fallback_analysis(fallback_product_data, user_target, user_budget)
+            # product_data was normalized to a non-empty dict above
+            return self._get_fallback_analysis(product_data, user_target, user_budget)
     
     async def analyze_market_price(self, product_title: str, category: str, current_price: int) -> Dict[str, Any]:
         """Enhanced market price analysis with category-specific intelligence"""
+        cache_key = (product_title.lower().strip(), category, current_price)
+        cached = self._market_price_cache.get(cache_key)
+        if cached is not None:
+            # Callers may mutate the result, so never hand out the cached dict itself
+            return copy.deepcopy(cached)
+        
         try:
             # Get category-specific price ranges
-            category_info = self.category_price_ranges.get(category, {
-                'min': 1000, 'max': 100000, 'depreciation': 0.2
-            })
+            category_info = self.category_price_ranges.get(category, _DEFAULT_CATEGORY_RANGE)
             
             # Estimate market value based on category and features
             estimated_market_value = self._estimate_market_value(product_title, category, current_price)
@@ -1042,59 +1663,37 @@ class MarketIntelligence:
             
             # Generate price insights
             price_insights = self._analyze_pricing_patterns(current_price, estimated_market_value, category_info)
+            market_position, negotiation_potential = _market_scores(current_price, estimated_market_value)
             
-            return {
+            analysis = {
                 'estimated_market_value': estimated_market_value,
                 'category_price_range': category_info,
-                'price_comparison': {
-                    'vs_category_min': ((current_price - category_info['min']) / category_info['min']) * 100,
-                    'vs_category_max': ((current_price - category_info['max']) / category_info['max']) * 100,
-                    'vs_estimated_value': ((current_price - estimated_market_value) / estimated_market_value) * 100
-                },
+                'price_comparison': _price_comparison(
+                    current_price, category_info['min'], category_info['max'], estimated_market_value
+                ),
                 'depreciation_factor': depreciation_factor,
                 'price_insights': price_insights,
-                'market_position': self._determine_market_position(current_price, estimated_market_value),
-                'negotiation_potential': self._assess_negotiation_potential(current_price, estimated_market_value)
+                'market_position': market_position,
+                'negotiation_potential': negotiation_potential
             }
+            self._market_price_cache[cache_key] = analysis
+            return copy.deepcopy(analysis)
             
         except Exception as e:
             logger.error(f"Error analyzing market price: {e}")
             return self._get_fallback_market_analysis(current_price, category)
     
-    def _analyze_product_condition(self, description: str, condition: str, price: int) -> Dict[str, Any]:
+    def _analyze_product_condition(self, description: str, condition: str, price: int,
+                                   ctx: Optional[ProductContext] = None) -> Dict[str, Any]:
         """Analyze product condition and its impact on pricing"""
-        desc_lower = description.lower()
+        # One scan of the description for every keyword bucket (already done when ctx is given)
+        found = ctx.desc_keywords if ctx else _scan_listing_keywords(description.lower())
         
         # Condition indicators
-        positive_indicators = []
-        negative_indicators = []
-        
-        # Positive condition keywords
-        positive_keywords = [
-            'excellent', 'perfect', 'mint', 'brand new', 'like new', 'unused',
-            'warranty', 'box pack', 'original', 'pristine', 'immaculate'
-        ]
-        
-        # Negative condition keywords  
-        negative_keywords = [
-            'damaged', 'broken', 'scratched', 'dent', 'crack', 'issue',
-            'problem', 'fault', 'repair needed', 'not working', 'defect'
-        ]
-        
-        # Maintenance keywords
-        maintenance_keywords = [
-            'serviced', 'maintained', 'cleaned', 'tested', 'working perfectly'
-        ]
-        
-        for keyword in positive_keywords:
-            if keyword in desc_lower:
-                positive_indicators.append(keyword.title())
-        
-        for keyword in negative_keywords:
-            if keyword in desc_lower:
-                negative_indicators.append(keyword.title())
+        positive_indicators = [keyword.title() for keyword in POSITIVE_KEYWORDS if keyword in found]
+        negative_indicators = [keyword.title() for keyword in NEGATIVE_KEYWORDS if keyword in found]
         
-        maintenance_score = sum(1 for keyword in maintenance_keywords if keyword in desc_lower)
+        maintenance_score = sum(1 for keyword in MAINTENANCE_KEYWORDS if keyword in found)
         
         # Calculate condition impact on price
         condition_multiplier = {
@@ -1115,7 +1714,8 @@ class MarketIntelligence:
             'selling_points': positive_indicators
         }
     
-    def _analyze_price_justification(self, product_data: Dict, market_analysis: Dict) -> Dict[str, Any]:
+    def _analyze_price_justification(self, product_data: Dict, market_analysis: Dict,
+                                     ctx: Optional[ProductContext] = None) -> Dict[str, Any]:
         """Analyze if the current price is justified"""
         current_price = product_data.get('price', 0)
         estimated_value = market_analysis.get('estimated_market_value', current_price)
@@ -1127,18 +1727,15 @@ class MarketIntelligence:
         overpricing_reasons = []
         
         # Check for premium factors
-        description = product_data.get('description', '').lower()
-        title = product_data.get('title', '').lower()
+        ctx = ctx or ProductContext.from_product(product_data)
+        found = ctx.desc_keywords | ctx.title_keywords
         
-        premium_keywords = ['warranty', 'original', 'accessories', 'bill', 'invoice', 'sealed']
-        discount_keywords = ['urgent', 'quick sale', 'moving', 'need cash', 'negotiable']
-        
-        for keyword in premium_keywords:
-            if keyword in description or keyword in title:
+        for keyword in PREMIUM_KEYWORDS:
+            if keyword in found:
                 justification_factors.append(f"Includes {keyword}")
         
-        for keyword in discount_keywords:
-            if keyword in description or keyword in title:
+        for keyword in DISCOUNT_KEYWORDS:
+            if keyword in found:
                 overpricing_reasons.append(f"Seller indicates {keyword}")
         
         if price_difference_pct > 20:
@@ -1157,45 +1754,43 @@ class MarketIntelligence:
         }
     
     def _generate_negotiation_points(self, product_data: Dict, market_analysis: Dict, 
-                                   condition_analysis: Dict, user_target: int, user_budget: int) -> Dict[str, Any]:
+                                   condition_analysis: Dict, user_target: int, user_budget: int,
+                                   ctx: Optional[ProductContext] = None) -> Dict[str, Any]:
         """Generate comprehensive negotiation talking points"""
         
+        current_price = product_data.get('price', 0)
+        estimated_value = market_analysis.get('estimated_market_value', current_price)
+        
+        # Opening points and the fixed seller-facing points; the rest are filled in below
         talking_points = {
-            'opening_points': [],
+            'opening_points': [
+                f"I'm interested in this {product_data.get('category', 'item')}",
+                "I've been researching similar products in the market",
+                f"My budget is around {_fmt_inr(user_target)} for this type of product"
+            ],
             'price_justification': [],
             'condition_concerns': [],
             'market_comparisons': [],
             'urgency_factors': [],
-            'value_propositions': [],
+            'value_propositions': list(_VALUE_PROPOSITIONS),
             'closing_arguments': []
         }
         
-        current_price = product_data.get('price', 0)
-        estimated_value = market_analysis.get('estimated_market_value', current_price)
-        
-        # Opening negotiation points
-        talking_points['opening_points'] = [
-            f"I'm interested in this {product_data.get('category', 'item')}",
-            "I've been researching similar products in the market",
-            f"My budget is around ₹{user_target:,} for this type of product"
-        ]
-        
         # Price justification points
         if current_price > estimated_value:
             diff_pct = ((current_price - estimated_value) / estimated_value) * 100
-            talking_points['price_justification'].append(
-                f"Based on market research, similar items are selling for around ₹{estimated_value:,}"
-            )
-            talking_points['price_justification'].append(
+            talking_points['price_justification'].extend((
+                f"Based on market research, similar items are selling for around {_fmt_inr(estimated_value)}",
                 f"Your asking price is {diff_pct:.0f}% above the market average"
-            )
+            ))
         
         # Condition-based points
-        if condition_analysis['negative_indicators']:
-            talking_points['condition_concerns'].extend([
-                f"I noticed the listing mentions: {', '.join(condition_analysis['negative_indicators'][:2])}",
+        negative_indicators = condition_analysis['negative_indicators']
+        if negative_indicators:
+            talking_points['condition_concerns'].extend((
+                f"I noticed the listing mentions: {', '.join(negative_indicators[:2])}",
                 "Given the condition, I'd need to factor in potential repair or replacement costs"
-            ])
+            ))
         
         if condition_analysis['condition'] != 'Excellent':
             expected_discount = int((1 - condition_analysis['condition_multiplier']) * 100)
@@ -1209,33 +1804,19 @@ class MarketIntelligence:
         if category_range and current_price > category_range.get('min', 0):
             talking_points['market_comparisons'].append(
                 f"I've seen similar {product_data.get('category', 'items')} "
-                f"starting from ₹{category_range['min']:,} in the market"
+                f"starting from {_fmt_inr(category_range['min'])} in the market"
             )
         
         # Urgency and seller motivation
-        description_lower = product_data.get('description', '').lower()
-        urgent_keywords = ['urgent', 'quick sale', 'moving', 'immediate', 'asap']
-        if any(keyword in description_lower for keyword in urgent_keywords):
-            talking_points['urgency_factors'].append(
-                "I can proceed immediately if we can agree on a fair price"
-            )
-            talking_points['urgency_factors'].append(
-                "I understand you're looking for a quick sale"
-            )
-        
-        # Value propositions for seller
-        talking_points['value_propositions'] = [
-            "I'm a serious buyer with cash ready",
-            "No financing delays or complications",
-            "Can complete the transaction quickly"
-        ]
+        ctx = ctx or ProductContext.from_product(product_data)
+        if any(keyword in ctx.desc_keywords for keyword in URGENT_KEYWORDS):
+            talking_points['urgency_factors'].extend(_URGENCY_POINTS)
         
         # Calculate target offer
         target_offer = min(user_target, int(estimated_value * 0.9))
         talking_points['closing_arguments'] = [
-            f"I can offer ₹{target_offer:,} for an immediate purchase",
-            "This is a fair offer considering the current market conditions",
-            "Let me know if this works for you"
+            f"I can offer {_fmt_inr(target_offer)} for an immediate purchase",
+            *_CLOSING_TAIL
         ]
         
         return talking_points
@@ -1316,7 +1897,8 @@ class MarketIntelligence:
         
         return strategy
     
-    def _assess_negotiation_risks(self, product_data: Dict, market_analysis: Dict) -> Dict[str, Any]:
+    def _assess_negotiation_risks(self, product_data: Dict, market_analysis: Dict,
+                                  ctx: Optional[ProductContext] = None) -> Dict[str, Any]:
         """Assess risks in the negotiation"""
         
         risks = {
@@ -1332,23 +1914,23 @@ class MarketIntelligence:
         estimated_value = market_analysis.get('estimated_market_value', current_price)
         
         # Price-based risks
+        # The two price bands are mutually exclusive for any non-negative estimate
         if current_price < estimated_value * 0.7:
             risks['high_risks'].append("Price significantly below market - possible hidden issues")
             risks['red_flags'].append("suspiciously_low_price")
-        
-        if current_price > estimated_value * 1.5:
+        elif current_price > estimated_value * 1.5:
             risks['medium_risks'].append("Overpriced product - seller may be inflexible on price")
         
         # Product-based risks
-        description = product_data.get('description', '').lower()
-        if any(word in description for word in ['damaged', 'broken', 'issue', 'problem']):
+        desc_tokens = (ctx or ProductContext.from_product(product_data)).desc_tokens
+        if desc_tokens and not _DEFECT_WORDS.isdisjoint(desc_tokens):
             risks['high_risks'].append("Product has disclosed defects or issues")
         
         if product_data.get('condition') == 'Poor':
             risks['high_risks'].append("Poor condition may lead to additional costs")
         
         # Seller-based risks
-        if 'urgent' in description and current_price < estimated_value:
+        if desc_tokens and current_price < estimated_value and 'urgent' in desc_tokens:
             risks['medium_risks'].append("Urgent sale at low price - verify authenticity")
         
         # Location-based risks
@@ -1357,13 +1939,7 @@ class MarketIntelligence:
             risks['medium_risks'].append("Location not specified - transportation costs unclear")
         
         # Mitigation strategies
-        risks['mitigation_strategies'] = [
-            "Request additional photos and detailed condition report",
-            "Arrange physical inspection before finalizing",
-            "Verify seller credentials and product authenticity",
-            "Factor in potential repair/replacement costs",
-            "Set clear terms for transaction and handover"
-        ]
+        risks['mitigation_strategies'] = list(_MITIGATION_STRATEGIES)
         
         # Calculate overall risk level
         total_high_risks = len(risks['high_risks'])
@@ -1381,184 +1957,81 @@ class MarketIntelligence:
     def _estimate_market_value(self, title: str, category: str, current_price: int) -> int:
         """Estimate market value based on product details and category"""
         category_info = self.category_price_ranges.get(category, {'min': 1000, 'max': 100000})
-        
-        # Base estimation on category median
-        category_median = (category_info['min'] + category_info['max']) / 2
-        
-        # Adjust based on title keywords
-        title_lower = title.lower()
-        
-        # Premium brand multipliers
-        premium_multipliers = {
-            'apple': 1.3, 'iphone': 1.3, 'macbook': 1.4,
-            'samsung': 1.2, 'sony': 1.2, 'lg': 1.1,
-            'mercedes': 1.5, 'bmw': 1.4, 'audi': 1.4,
-            'premium': 1.2, 'pro': 1.15, 'plus': 1.1
-        }
-        
-        multiplier = 1.0
-        for brand, mult in premium_multipliers.items():
-            if brand in title_lower:
-                multiplier = max(multiplier, mult)
-                break
-        
-        # Age-based depreciation estimation
-        age_keywords = {
-            '2024': 0.95, '2023': 0.85, '2022': 0.75, '2021': 0.65,
-            'new': 1.0, 'old': 0.7, 'vintage': 0.5
-        }
-        
-        age_factor = 0.8  # Default age factor
-        for keyword, factor in age_keywords.items():
-            if keyword in title_lower:
-                age_factor = factor
-                break
-        
-        # Calculate estimated value
-        estimated_value = int(category_median * multiplier * age_factor)
-        
-        # If current price is reasonable, blend with it
-        if category_info['min'] <= current_price <= category_info['max'] * 1.5:
-            estimated_value = int((estimated_value + current_price) / 2)
-        
-        return max(category_info['min'], min(estimated_value, category_info['max']))
+        return _estimate_market_value(title.lower(), category_info['min'], category_info['max'], current_price)
     
     def _calculate_depreciation(self, title: str, category: str) -> float:
         """Calculate depreciation factor based on product age and category"""
         category_info = self.category_price_ranges.get(category, {'depreciation': 0.2})
-        base_depreciation = category_info['depreciation']
-        
-        title_lower = title.lower()
-        
-        # Estimate age from title
-        current_year = 2025
-        for year in range(2020, current_year + 1):
-            if str(year) in title_lower:
-                age = current_year - year
-                return min(base_depreciation * age, 0.8)  # Max 80% depreciation
-        
-        # Default depreciation for used items
-        return base_depreciation * 2  # Assume 2 years old if no year mentioned
+        return _calculate_depreciation(title.lower(), category_info['depreciation'])
     
     def _analyze_pricing_patterns(self, current_price: int, estimated_value: int, category_info: Dict) -> List[str]:
         """Analyze pricing patterns and generate insights"""
-        insights = []
-        
         price_vs_estimate = (current_price - estimated_value) / estimated_value * 100
+        category_insight = _category_bucket(current_price, category_info['min'], category_info['max'])
         
-        if price_vs_estimate > 25:
-            insights.append("Significantly overpriced - strong negotiation potential")
-        elif price_vs_estimate > 10:
-            insights.append("Moderately overpriced - good negotiation room")
-        elif price_vs_estimate < -10:
-            insights.append("Below market value - may indicate urgency or condition issues")
-        else:
-            insights.append("Reasonably priced according to market standards")
-        
-        # Category-specific insights
-        if current_price < category_info['min'] * 1.2:
-            insights.append("Price at lower end of category range")
-        elif current_price > category_info['max'] * 0.8:
-            insights.append("Price at higher end of category range")
-        
-        return insights
+        if category_insight:
+            return [_price_bucket(price_vs_estimate), category_insight]
+        return [_price_bucket(price_vs_estimate)]
     
     def _determine_market_position(self, current_price: int, estimated_value: int) -> str:
         """Determine market position of the product"""
-        ratio = current_price / estimated_value if estimated_value > 0 else 1
-        
-        if ratio > 1.3:
-            return "premium_priced"
-        elif ratio > 1.1:
-            return "above_market"
-        elif ratio < 0.8:
-            return "below_market"
-        elif ratio < 0.9:
-            return "competitive"
-        else:
-            return "market_average"
+        return _market_scores(current_price, estimated_value)[0]
     
     def _assess_negotiation_potential(self, current_price: int, estimated_value: int) -> float:
         """Assess negotiation potential as a percentage"""
-        if estimated_value <= 0:
-            return 0.15  # Default 15%
-        
-        overpricing = max(0, (current_price - estimated_value) / estimated_value)
-        
-        # Base negotiation potential: 10-30% depending on overpricing
-        potential = 0.1 + (overpricing * 0.5)
-        
-        return min(potential, 0.3)  # Cap at 30%
+        return _market_scores(current_price, estimated_value)[1]
     
     def _get_fallback_market_analysis(self, current_price: int, category: str) -> Dict[str, Any]:
         """Fallback market analysis when full analysis fails"""
+        cached = self._fallback_analysis_cache.get((current_price, category))
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
         category_info = self.category_price_ranges.get(category, {'min': 1000, 'max': 100000})
-        estimated_value = (category_info['min'] + category_info['max']) / 2
+        estimated_value = (category_info['min'] + category_info['max']) // 2
         
-        return {
-            'estimated_market_value': int(estimated_value),
+        analysis = {
+            'estimated_market_value': estimated_value,
             'category_price_range': category_info,
-            'price_comparison': {
-                'vs_category_min': ((current_price - category_info['min']) / category_info['min']) * 100,
-                'vs_category_max': ((current_price - category_info['max']) / category_info['max']) * 100,
-                'vs_estimated_value': ((current_price - estimated_value) / estimated_value) * 100
-            },
+            'price_comparison': _price_comparison(
+                current_price, category_info['min'], category_info['max'], estimated_value
+            ),
             'depreciation_factor': 0.2,
             'price_insights': ["Market analysis based on category averages"],
             'market_position': self._determine_market_position(current_price, estimated_value),
             'negotiation_potential': 0.15
         }
+        self._fallback_analysis_cache[(current_price, category)] = analysis
+        return copy.deepcopy(analysis)
     
     def _calculate_confidence_score(self, market_analysis: Dict, condition_analysis: Dict) -> float:
         """Calculate confidence score for the analysis"""
-        
-        # Base confidence factors
-        price_confidence = 0.7  # Moderate confidence in price analysis
-        condition_confidence = 0.8 if condition_analysis['positive_indicators'] or condition_analysis['negative_indicators'] else 0.6
-        market_confidence = 0.6  # Limited market data confidence
-        
-        # Adjust based on available data quality
-        if market_analysis.get('negotiation_potential', 0) > 0.2:
-            price_confidence += 0.1
-        
-        if len(condition_analysis.get('positive_indicators', [])) > 2:
-            condition_confidence += 0.1
-        
-        overall_confidence = (price_confidence * 0.4 + condition_confidence * 0.3 + market_confidence * 0.3)
-        
-        return min(0.95, max(0.3, overall_confidence))  # Clamp between 30% and 95%
+        return _confidence_score(
+            market_analysis.get('negotiation_potential', 0),
+            len(condition_analysis.get('positive_indicators', [])),
+            len(condition_analysis.get('negative_indicators', []))
+        )
     
     def _generate_action_plan(self, strategy: Dict, talking_points: Dict) -> List[str]:
         """Generate recommended action plan"""
-        actions = []
-        
-        # Pre-negotiation actions
-        actions.append("Research similar products in your area for comparison")
-        actions.append("Prepare list of questions about product condition and history")
-        
-        # Negotiation approach
         success_prob = strategy.get('success_probability', 50)
-        if success_prob > 70:
-            actions.append("Approach with confidence - analysis shows favorable negotiation position")
-        elif success_prob < 40:
-            actions.append("Proceed cautiously - consider if this is the right deal for you")
-        
-        # Specific tactical actions
-        actions.append(f"Start with opening offer of ₹{strategy.get('opening_offer', 0):,}")
-        actions.append("Use market data to justify your offer")
-        
-        if talking_points.get('condition_concerns'):
-            actions.append("Address condition concerns early in negotiation")
-        
-        actions.append(f"Be prepared to go up to ₹{strategy.get('fallback_offer', 0):,} maximum")
-        actions.append("Set clear timeline for decision to create urgency")
         
-        return actions
+        # Pre-negotiation actions, then approach and tactics; None entries are dropped
+        steps = (
+            _APPROACH_HIGH if success_prob > 70 else _APPROACH_LOW if success_prob < 40 else None,
+            f"Start with opening offer of {_fmt_inr(strategy.get('opening_offer', 0))}",
+            "Use market data to justify your offer",
+            _ADDRESS_CONCERNS if talking_points.get('condition_concerns') else None,
+            f"Be prepared to go up to {_fmt_inr(strategy.get('fallback_offer', 0))} maximum",
+            "Set clear timeline for decision to create urgency",
+        )
+        return [*_PRE_NEGOTIATION_ACTIONS, *filter(None, steps)]
     
     def _get_fallback_analysis(self, product_data: Dict, user_target: int, user_budget: int) -> Dict[str, Any]:
         """Fallback analysis when comprehensive analysis fails"""
         current_price = product_data.get('price', 0)
         category = product_data.get('category', 'Other')
+        target = _fmt_inr(user_target)
         
         return {
             'market_analysis': self._get_fallback_market_analysis(current_price, category),
@@ -1575,23 +2048,19 @@ class MarketIntelligence:
                 'fair_price_estimate': user_target
             },
             'negotiation_points': {
-                'opening_points': [f"I'm interested in this {category}"],
-                'price_justification': [f"My budget is around ₹{user_target:,}"],
-                'closing_arguments': [f"I can offer ₹{user_target:,} for immediate purchase"]
+                'opening_points': [_FALLBACK_OPENING.format(category=category)],
+                'price_justification': [_FALLBACK_JUSTIFY.format(target=target)],
+                'closing_arguments': [_FALLBACK_CLOSING.format(target=target)]
             },
             'strategy': {
                 'opening_offer': user_target,
                 'success_probability': 60,
-                'key_tactics': ['cash_buyer_advantage', 'immediate_closure']
+                'key_tactics': list(_FALLBACK_KEY_TACTICS)
             },
             'risk_assessment': {
                 'overall_risk_level': 'medium',
-                'mitigation_strategies': ['Verify product condition before purchase']
+                'mitigation_strategies': list(_FALLBACK_MITIGATION)
             },
             'confidence_score': 0.5,
-            'recommended_actions': [
-                f"Start negotiation at ₹{user_target:,}",
-                "Verify product condition",
-                "Complete transaction quickly if price agreed"
-            ]
+            'recommended_actions': [_FALLBACK_START.format(target=target), *_FALLBACK_FOLLOW_UP_ACTIONS]
         }
\ No newline at end of file
@@ -4,20 +4,46 @@ Handles complete negotiation session lifecycle with analytics and learning
 """
 
 import asyncio
-from typing import Dict, List, Optional, Any
+from collections import Counter, deque
+from heapq import nlargest
+from operator import itemgetter
+from typing import Dict, List, Mapping, Optional, Any
 from datetime import datetime, timedelta
 import json
+import os
+import re
+import sys
+import time
 import uuid
+from secrets import token_hex
 from enum import Enum
+from types import MappingProxyType
 import logging
+from cachetools import TTLCache
 from models import NegotiationSession, ChatMessage, Product, NegotiationParams
 from database import JSONDatabase
 from scraper_service import MarketplaceScraper, MarketIntelligence
 from enhanced_scraper import EnhancedMarketplaceScraper
 from negotiation_engine import AdvancedNegotiationEngine, NegotiationPhase
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Upper bound on product scrapes in flight across all new sessions, so a burst of session
+# creations queues here instead of flooding the marketplaces and the shared connection pool
+SCRAPE_CONCURRENCY = int(os.getenv("SESSION_SCRAPE_CONCURRENCY", "32"))
+
+# Most recent AI confidence values kept per session for trend analysis
+CONFIDENCE_HISTORY_LIMIT = 64
+
+# Seconds to let in-flight turns coalesce before dirty sessions are written to the database
+SESSION_FLUSH_INTERVAL = 0.1
+
 class SessionStatus(Enum):
     INITIALIZING = "initializing"
     ACTIVE = "active"
@@ -42,17 +68,187 @@ class InterventionTrigger(Enum):
     TECHNICAL_ISSUE = "technical_issue"
     USER_REQUEST = "user_request"
 
+class _SlotRecord:
+    """Fixed-layout record that also answers dict-style lookups, for callers using record['key']"""
+    __slots__ = ()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def keys(self):
+        return iter(self.__slots__)
+
+class PerfMetrics(_SlotRecord):
+    """Live performance counters for one negotiation session"""
+    __slots__ = ('messages_sent', 'price_concessions_achieved', 'negotiation_effectiveness',
+                 'time_to_first_response', 'confidence_history')
+    
+    def __init__(self):
+        self.messages_sent = 0
+        self.price_concessions_achieved = 0
+        self.negotiation_effectiveness = 0.0
+        self.time_to_first_response: Optional[float] = None
+        self.confidence_history: deque = deque(maxlen=CONFIDENCE_HISTORY_LIMIT)
+
+class ActiveSessionData(_SlotRecord):
+    """In-memory state of an active negotiation session"""
+    __slots__ = ('session', 'product', 'market_analysis', 'strategy', 'phase', 'intervention_triggers',
+                 'performance_metrics', 'start_time', 'start_monotonic', 'tactics_history',
+                 'seller_personality')
+    
+    def __init__(self, session: NegotiationSession, product: Product, market_analysis: Dict[str, Any],
+                 strategy: Dict[str, Any], phase: Any = NegotiationPhase.OPENING):
+        self.session = session
+        self.product = product
+        self.market_analysis = market_analysis
+        self.strategy = strategy
+        self.phase = phase
+        self.intervention_triggers: List[Dict[str, Any]] = []
+        self.performance_metrics = PerfMetrics()
+        self.start_time: Optional[datetime] = None
+        self.start_monotonic: Optional[float] = None  # time.monotonic() at start, for elapsed-time math
+        self.tactics_history: List[str] = []
+        self.seller_personality: Optional[str] = None
+
+# Seller phrases that call for a human, one named group per InterventionTrigger value in
+# priority order; overlapping lookahead matches so every category present is reported
+_INTERVENTION_RE = re.compile(
+    r'(?=(?P<seller_request>speak to you directly|call you|talk to owner|real person)'
+    r'|(?P<complex_terms>warranty|return policy|legal|contract|documentation)'
+    r'|(?P<technical_issue>not working|error|problem with|technical issue))'
+)
+
+# Rupee amounts quoted in chat messages, e.g. "₹12,500"
+_PRICE_RE = re.compile(r'₹[\s,]*(\d+(?:,\d+)*)')
+
+# Strategy adjustments per user approach and timeline, merged into the initial strategy
+_APPROACH_ADJUSTMENTS = {
+    'assertive': {'confidence_multiplier': 1.2, 'concession_rate': 0.05},    # Smaller concessions
+    'diplomatic': {'confidence_multiplier': 1.0, 'concession_rate': 0.1},    # Moderate concessions
+    'considerate': {'confidence_multiplier': 0.8, 'concession_rate': 0.15},  # Larger concessions
+}
+_TIMELINE_ADJUSTMENTS = {
+    'urgent': {'max_rounds': 5, 'urgency_factor': 1.3},
+    'flexible': {'max_rounds': 12, 'urgency_factor': 0.8},
+    'week': {'max_rounds': 8, 'urgency_factor': 1.0},
+}
+
+_DEFAULT_HANDOFF_MESSAGE = "Let me connect you with a human colleague for better assistance."
+
+# Acceptance wording and rupee amounts in one alternation, so a message is scanned once for both
+_ACCEPT_PRICE_RE = re.compile(r'(?P<accept>accept|deal|agree)|₹[\s,]*(?P<price>\d+(?:,\d+)*)')
+
 class AdvancedSessionManager:
     """Manages complete negotiation session lifecycle"""
     
+    # Message sent to the seller when a trigger hands the negotiation to a human
+    _HANDOFF_MESSAGES = MappingProxyType({
+        InterventionTrigger.SELLER_REQUEST: "I understand you'd like to speak directly. Let me connect you with my colleague who can assist you better.",
+        InterventionTrigger.COMPLEX_TERMS: "These are important details that need careful consideration. Let me have someone with more expertise help us.",
+        InterventionTrigger.DEADLOCK: "Let me bring in a colleague who might have a fresh perspective on this negotiation.",
+        InterventionTrigger.TECHNICAL_ISSUE: "I want to make sure we address your concerns properly. Let me connect you with someone who can help."
+    })
+    
     def __init__(self, db: JSONDatabase, enhanced_ai_service=None):
         self.db = db
-        self.active_sessions: Dict[str, Dict] = {}
+        self.active_sessions: Dict[str, ActiveSessionData] = {}
+        # One lock per active session; turns of different sessions never contend
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._scrape_semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
         self.negotiation_engine = AdvancedNegotiationEngine()
         self.market_intelligence = MarketIntelligence()
         self.session_analytics = SessionAnalytics()
         self.learning_engine = LearningEngine()
         self.enhanced_ai_service = enhanced_ai_service  # Enhanced AI service for intelligent negotiation
+        self.enhanced_scraper = None  # Shared scraper on the app's pooled HTTP session, set at startup
+        self._owns_scraper = False
+        # Sessions awaiting a write, keyed by id; flushed in batches by a background task
+        self._dirty_sessions: Dict[str, NegotiationSession] = {}
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        """Lock serializing the turns of one session"""
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        return lock
+    
+    async def _get_scraper(self) -> EnhancedMarketplaceScraper:
+        """Return the long-lived scraper, opening one of our own if none was shared at startup"""
+        if self.enhanced_scraper is None:
+            scraper = EnhancedMarketplaceScraper()
+            await scraper.__aenter__()
+            self.enhanced_scraper = scraper
+            self._owns_scraper = True
+        return self.enhanced_scraper
+    
+    def _mark_dirty(self, session: NegotiationSession):
+        """Queue a session for the next batched write instead of saving it immediately"""
+        self._dirty_sessions[session.id] = session
+        if self._flush_task is None or self._flush_task.done():
+            # Started lazily: the manager is constructed before the event loop runs
+            self._flush_event = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        self._flush_event.set()
+    
+    async def _flush_loop(self):
+        """Write dirty sessions in batches, coalescing every save requested within the interval"""
+        while True:
+            await self._flush_event.wait()
+            await asyncio.sleep(SESSION_FLUSH_INTERVAL)
+            self._flush_event.clear()
+            await self._flush_dirty_sessions()
+    
+    async def _flush_dirty_sessions(self):
+        """Save every queued session once; failed or interrupted saves go back on the queue"""
+        pending, self._dirty_sessions = self._dirty_sessions, {}
+        try:
+            for session_id, session in list(pending.items()):
+                try:
+                    await self.db.save_session(session)
+                except Exception as e:
+                    logger.error("Error saving session %s: %s", session_id, e)
+                    continue
+                del pending[session_id]
+        finally:
+            # Sessions queued again since the swap keep their newer entry
+            for session_id, session in pending.items():
+                self._dirty_sessions.setdefault(session_id, session)
+    
+    async def _save_session_now(self, session: NegotiationSession):
+        """Save a session immediately (creation, start, terminal states), dropping any queued write for it"""
+        self._dirty_sessions.pop(session.id, None)
+        await self.db.save_session(session)
+    
+    async def shutdown(self):
+        """Flush pending session writes and close the scraper session if this manager opened it"""
+        if self._flush_task is not None:
+            # Wait for the cancel to land so a half-done batch is back on the queue before draining
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush_dirty_sessions()
+        if self._owns_scraper and self.enhanced_scraper is not None:
+            await self.enhanced_scraper.__aexit__(None, None, None)
+            self.enhanced_scraper = None
+            self._owns_scraper = False
     
     async def create_session_from_url(self, product_url: str, params: NegotiationParams) -> Dict[str, Any]:
         """
@@ -62,48 +258,53 @@ class AdvancedSessionManager:
             session_id = str(uuid.uuid4())
             
             # Step 1: Scrape product information
-            logger.info(f"Scraping product from URL: {product_url}")
+            logger.info("Scraping product from URL: %s", product_url)
             
-            # Use enhanced scraper for better success rate
-            async with EnhancedMarketplaceScraper() as scraper:
+            # Use enhanced scraper for better success rate; one session is reused across all URLs
+            scraper = await self._get_scraper()
+            async with self._scrape_semaphore:
                 product_data = await scraper.scrape_product(product_url)
             
             if not product_data or not isinstance(product_data, dict):
                 raise ValueError("Could not scrape product information from URL")
             
-            # Step 2: Comprehensive market intelligence and product analysis
-            logger.info("Performing comprehensive product analysis...")
-            try:
-                market_analysis = await self.market_intelligence.comprehensive_product_analysis(
-                    product_data, params.target_price, params.max_budget
-                )
-            except Exception as e:
-                logger.warning(f"Comprehensive analysis failed, using fallback: {e}")
-                # Create basic market analysis if comprehensive fails
-                market_analysis = {
-                    'market_analysis': {'estimated_value': product_data.get('price', params.max_budget)},
-                    'condition_analysis': {'score': 0.7},
-                    'price_justification': {'is_reasonable': True},
-                    'negotiation_points': {'key_points': ['Product condition', 'Market price']},
-                    'strategy': {'approach': 'conservative', 'success_probability': 0.6},
-                    'risk_assessment': {'level': 'medium'},
-                    'confidence_score': 0.6,
-                    'recommended_actions': ['Start with polite inquiry', 'Present reasonable offer']
-                }
-            
-            # Step 3: Create Product object
+            # Step 2: Create Product object
             product = Product(
                 id=f"scraped_{session_id}",
                 **product_data
             )
             
-            # Step 4: Save product to database
-            await self.db.save_product(product)
+            # Step 3: Save product to database while the analysis runs; neither needs the other
+            save_task = asyncio.create_task(self.db.save_product(product))
             
-            # Step 5: Strategy formulation based on market data
-            strategy_data = await self._formulate_initial_strategy(
-                product, params, market_analysis
-            )
+            try:
+                # Step 4: Comprehensive market intelligence and product analysis
+                logger.info("Performing comprehensive product analysis...")
+                try:
+                    market_analysis = await self.market_intelligence.comprehensive_product_analysis(
+                        product_data, params.target_price, params.max_budget
+                    )
+                except Exception as e:
+                    logger.warning("Comprehensive analysis failed, using fallback: %s", e)
+                    # Create basic market analysis if comprehensive fails
+                    market_analysis = {
+                        'market_analysis': {'estimated_value': product_data.get('price', params.max_budget)},
+                        'condition_analysis': {'score': 0.7},
+                        'price_justification': {'is_reasonable': True},
+                        'negotiation_points': {'key_points': ['Product condition', 'Market price']},
+                        'strategy': {'approach': 'conservative', 'success_probability': 0.6},
+                        'risk_assessment': {'level': 'medium'},
+                        'confidence_score': 0.6,
+                        'recommended_actions': ['Start with polite inquiry', 'Present reasonable offer']
+                    }
+                
+                # Step 5: Strategy formulation based on market data
+                strategy_data = await self._formulate_initial_strategy(
+                    product, params, market_analysis
+                )
+            finally:
+                # Never leave the product write orphaned, even when analysis or strategy fails
+                await save_task
             
             # Step 5.5: Update params with correct product_id
             params.product_id = product.id
@@ -119,26 +320,13 @@ class AdvancedSessionManager:
             )
             
             # Enhanced session data
-            session_data = {
-                'session': session,
-                'product': product,
-                'market_analysis': market_analysis,
-                'strategy': strategy_data,
-                'phase': NegotiationPhase.OPENING,
-                'intervention_triggers': [],
-                'performance_metrics': {
-                    'messages_sent': 0,
-                    'price_concessions_achieved': 0,
-                    'negotiation_effectiveness': 0.0,
-                    'time_to_first_response': None
-                }
-            }
+            session_data = ActiveSessionData(session, product, market_analysis, strategy_data)
             
             # Store active session
             self.active_sessions[session_id] = session_data
-            await self.db.save_session(session)
+            await self._save_session_now(session)
             
-            logger.info(f"Session {session_id} created successfully")
+            logger.info("Session %s created successfully", session_id)
             
             return {
                 'session_id': session_id,
@@ -161,13 +349,14 @@ class AdvancedSessionManager:
                 raise ValueError(f"Session {session_id} not found")
             
             session_data = self.active_sessions[session_id]
-            session = session_data['session']
-            product = session_data['product']
-            strategy = session_data['strategy']
+            session = session_data.session
+            product = session_data.product
+            strategy = session_data.strategy
             
             # Update session status
             session.status = SessionStatus.ACTIVE.value
-            session_data['start_time'] = datetime.now()
+            session_data.start_time = datetime.now()
+            session_data.start_monotonic = time.monotonic()
             
             # Generate opening message using negotiation engine
             opening_result = await self.negotiation_engine.process_negotiation_turn(
@@ -176,7 +365,7 @@ class AdvancedSessionManager:
             
             # Create opening message
             opening_message = ChatMessage(
-                id=str(uuid.uuid4()),
+                id=token_hex(16),
                 session_id=session_id,
                 sender="ai",
                 content=opening_result['response'],
@@ -186,12 +375,12 @@ class AdvancedSessionManager:
             
             # Add to session
             session.messages.append(opening_message)
-            session_data['performance_metrics']['messages_sent'] += 1
+            session_data.performance_metrics.messages_sent += 1
             
             # Save session
-            await self.db.save_session(session)
+            await self._save_session_now(session)
             
-            logger.info(f"Negotiation started for session {session_id}")
+            logger.info("Negotiation started for session %s", session_id)
             
             return {
                 'opening_message': opening_result['response'],
@@ -208,23 +397,34 @@ class AdvancedSessionManager:
         """
         Phase 3: Process seller response and generate AI counter-response
         """
+        # Turns of one session run one at a time, so completion (read + delete) and
+        # error handling never interleave with another turn on the same session
+        try:
+            async with self._session_lock(session_id):
+                return await self._process_seller_response(session_id, seller_message)
+        finally:
+            # Completed or unknown sessions no longer need a lock
+            if session_id not in self.active_sessions:
+                self._session_locks.pop(session_id, None)
+    
+    async def _process_seller_response(self, session_id: str, seller_message: str) -> Dict[str, Any]:
+        """Process one seller turn; caller holds the session's lock"""
         try:
             if session_id not in self.active_sessions:
                 raise ValueError(f"Session {session_id} not found")
             
             session_data = self.active_sessions[session_id]
-            session = session_data['session']
-            product = session_data['product']
+            session = session_data.session
+            product = session_data.product
+            metrics = session_data.performance_metrics
             
             # Record seller response time
-            if session_data['performance_metrics']['time_to_first_response'] is None:
-                session_data['performance_metrics']['time_to_first_response'] = (
-                    datetime.now() - session_data['start_time']
-                ).total_seconds()
+            if metrics.time_to_first_response is None and session_data.start_monotonic is not None:
+                metrics.time_to_first_response = time.monotonic() - session_data.start_monotonic
             
             # Create seller message
             seller_msg = ChatMessage(
-                id=str(uuid.uuid4()),
+                id=token_hex(16),
                 session_id=session_id,
                 sender="seller",
                 content=seller_message,
@@ -249,7 +449,7 @@ class AdvancedSessionManager:
                     'response': negotiation_result['response'],
                     'confidence': negotiation_result['confidence'],
                     'tactics_used': negotiation_result['tactics_used'],
-                    'phase': session_data.get('phase', 'exploration'),
+                    'phase': session_data.phase,
                     'decision': {
                         'action': negotiation_result.get('action_type', 'respond'),
                         'reasoning': negotiation_result.get('reasoning', ''),
@@ -265,7 +465,7 @@ class AdvancedSessionManager:
             
             # Create AI response message
             ai_message = ChatMessage(
-                id=str(uuid.uuid4()),
+                id=token_hex(16),
                 session_id=session_id,
                 sender="ai",
                 content=negotiation_result['response'],
@@ -274,10 +474,10 @@ class AdvancedSessionManager:
             )
             
             session.messages.append(ai_message)
-            session_data['performance_metrics']['messages_sent'] += 1
+            metrics.messages_sent += 1
             
             # Update session phase and metrics
-            session_data['phase'] = negotiation_result.get('phase', 'exploration')
+            session_data.phase = negotiation_result.get('phase', 'exploration')
             await self._update_performance_metrics(session_data, negotiation_result)
             
             # Check for completion conditions
@@ -286,7 +486,7 @@ class AdvancedSessionManager:
                 return await self._complete_session(session_id, completion_check)
             
             # Save session
-            await self.db.save_session(session)
+            self._mark_dirty(session)
             
             return {
                 'ai_response': negotiation_result['response'],
@@ -374,31 +574,14 @@ class AdvancedSessionManager:
             'timeline': params.timeline.value if hasattr(params.timeline, 'value') else params.timeline
         }
         
-        # Adjust AI behavior based on user approach
-        approach_val = strategy['user_approach']
-        if approach_val == 'assertive':
-            strategy['confidence_multiplier'] = 1.2
-            strategy['concession_rate'] = 0.05  # Smaller concessions
-        elif approach_val == 'diplomatic':
-            strategy['confidence_multiplier'] = 1.0
-            strategy['concession_rate'] = 0.1   # Moderate concessions
-        elif approach_val == 'considerate':
-            strategy['confidence_multiplier'] = 0.8
-            strategy['concession_rate'] = 0.15  # Larger concessions
+        # Adjust AI behavior based on user approach (unknown approaches get no adjustment)
+        strategy.update(_APPROACH_ADJUSTMENTS.get(strategy['user_approach'], {}))
         
         # Timeline adjustments
-        timeline_val = strategy['timeline']
-        if timeline_val == 'urgent':
-            strategy['max_rounds'] = 5
-            strategy['urgency_factor'] = 1.3
-        elif timeline_val == 'flexible':
-            strategy['max_rounds'] = 12
-            strategy['urgency_factor'] = 0.8
-        else:  # week
-            strategy['max_rounds'] = 8
-            strategy['urgency_factor'] = 1.0
-        
-        logger.info(f"Strategy formulated: {strategy['approach']} approach with {strategy['success_probability']:.0f}% success probability")
+        strategy.update(_TIMELINE_ADJUSTMENTS.get(strategy['timeline'], _TIMELINE_ADJUSTMENTS['week']))
+        
+        logger.info("Strategy formulated: %s approach with %.0f%% success probability",
+                    strategy['approach'], strategy['success_probability'])
         
         return strategy
     
@@ -411,19 +594,17 @@ class AdvancedSessionManager:
         Phase 5: Check if human intervention is needed
         """
         
-        message_lower = seller_message.lower()
         session = session_data['session']
         
+        # One scan of the message finds every phrase category present
+        found = {match.lastgroup for match in _INTERVENTION_RE.finditer(seller_message.lower())}
+        
         # Check for explicit seller requests
-        if any(phrase in message_lower for phrase in [
-            'speak to you directly', 'call you', 'talk to owner', 'real person'
-        ]):
+        if 'seller_request' in found:
             return InterventionTrigger.SELLER_REQUEST
         
         # Check for complex terms discussion
-        if any(phrase in message_lower for phrase in [
-            'warranty', 'return policy', 'legal', 'contract', 'documentation'
-        ]):
+        if 'complex_terms' in found:
             return InterventionTrigger.COMPLEX_TERMS
         
         # Check for deadlock (too many back-and-forth without progress)
@@ -433,9 +614,7 @@ class AdvancedSessionManager:
                 return InterventionTrigger.DEADLOCK
         
         # Check for technical issues
-        if any(phrase in message_lower for phrase in [
-            'not working', 'error', 'problem with', 'technical issue'
-        ]):
+        if 'technical_issue' in found:
             return InterventionTrigger.TECHNICAL_ISSUE
         
         return None
@@ -472,7 +651,7 @@ class AdvancedSessionManager:
         """
         
         session_data = self.active_sessions[session_id]
-        session = session_data['session']
+        session = session_data.session
         
         # Update session
         session.status = SessionStatus.COMPLETED.value
@@ -491,13 +670,13 @@ class AdvancedSessionManager:
         await self.learning_engine.update_from_session(session_data, outcome, final_metrics)
         
         # Save final session
-        await self.db.save_session(session)
+        await self._save_session_now(session)
         
         # Remove from active sessions
         if session_id in self.active_sessions:
             del self.active_sessions[session_id]
         
-        logger.info(f"Session {session_id} completed with outcome: {outcome.value}")
+        logger.info("Session %s completed with outcome: %s", session_id, outcome.value)
         
         return {
             'session_completed': True,
@@ -513,28 +692,21 @@ class AdvancedSessionManager:
         """
         
         session_data = self.active_sessions[session_id]
-        session = session_data['session']
+        session = session_data.session
         
         session.status = SessionStatus.HUMAN_HANDOFF.value
-        session_data['intervention_triggers'].append({
+        session_data.intervention_triggers.append({
             'trigger': trigger.value,
             'timestamp': datetime.now(),
             'message_count': len(session.messages)
         })
         
         # Generate handoff message
-        handoff_messages = {
-            InterventionTrigger.SELLER_REQUEST: "I understand you'd like to speak directly. Let me connect you with my colleague who can assist you better.",
-            InterventionTrigger.COMPLEX_TERMS: "These are important details that need careful consideration. Let me have someone with more expertise help us.",
-            InterventionTrigger.DEADLOCK: "Let me bring in a colleague who might have a fresh perspective on this negotiation.",
-            InterventionTrigger.TECHNICAL_ISSUE: "I want to make sure we address your concerns properly. Let me connect you with someone who can help."
-        }
-        
-        handoff_message = handoff_messages.get(trigger, "Let me connect you with a human colleague for better assistance.")
+        handoff_message = self._HANDOFF_MESSAGES.get(trigger, _DEFAULT_HANDOFF_MESSAGE)
         
         # Create handoff message
         handoff_msg = ChatMessage(
-            id=str(uuid.uuid4()),
+            id=token_hex(16),
             session_id=session_id,
             sender="ai",
             content=handoff_message,
@@ -543,7 +715,7 @@ class AdvancedSessionManager:
         )
         
         session.messages.append(handoff_msg)
-        await self.db.save_session(session)
+        await self._save_session_now(session)
         
         return {
             'handoff_triggered': True,
@@ -555,42 +727,38 @@ class AdvancedSessionManager:
     
     def _extract_recent_prices(self, messages: List[ChatMessage]) -> List[int]:
         """Extract prices mentioned in recent messages"""
-        import re
-        prices = []
-        
-        for msg in messages:
-            price_matches = re.findall(r'₹[\s,]*(\d+(?:,\d+)*)', msg.content)
-            for price_str in price_matches:
-                try:
-                    price = int(price_str.replace(',', ''))
-                    prices.append(price)
-                except ValueError:
-                    continue
-        
-        return prices
+        # One regex pass over all messages; NUL is not whitespace, comma or digit, so a price
+        # can't run across the join. The captures are digits and commas, so int() cannot fail
+        text = '\0'.join(msg.content for msg in messages)
+        return [int(match.group(1).replace(',', '')) for match in _PRICE_RE.finditer(text)]
     
     def _extract_final_agreed_price(self, messages: List[ChatMessage]) -> Optional[int]:
         """Extract final agreed price from successful negotiation"""
-        # Look for acceptance messages and extract price
+        # Look for acceptance messages and extract the last price they mention
         for msg in reversed(messages):
-            if msg.sender == "ai" and any(word in msg.content.lower() 
-                                         for word in ['accept', 'deal', 'agree']):
-                prices = self._extract_recent_prices([msg])
-                if prices:
-                    return prices[-1]
+            if msg.sender != "ai":
+                continue
+            accepted, price = False, None
+            for match in _ACCEPT_PRICE_RE.finditer(msg.content_lower):
+                if match.lastgroup == 'price':
+                    price = match.group('price')
+                else:
+                    accepted = True
+            if accepted and price is not None:
+                return int(price.replace(',', ''))
         return None
     
-    async def _update_performance_metrics(self, session_data: Dict[str, Any], negotiation_result: Dict[str, Any]):
+    async def _update_performance_metrics(self, session_data: ActiveSessionData, negotiation_result: Dict[str, Any]):
         """Update real-time performance metrics"""
         
-        metrics = session_data['performance_metrics']
+        metrics = session_data.performance_metrics
         decision = negotiation_result.get('decision', {})
         
         # Track price concessions
         if 'offer' in decision:
             current_offer = decision['offer']
-            target_price = session_data['session'].user_params.target_price
-            original_price = session_data['product'].price
+            target_price = session_data.session.user_params.target_price
+            original_price = session_data.product.price
             
             # Calculate negotiation progress
             total_gap = original_price - target_price
@@ -598,20 +766,17 @@ class AdvancedSessionManager:
             
             if total_gap > 0:
                 progress = current_gap / total_gap
-                metrics['negotiation_effectiveness'] = min(1.0, max(0.0, progress))
+                metrics.negotiation_effectiveness = min(1.0, max(0.0, progress))
         
         # Track confidence trends
-        confidence = negotiation_result.get('confidence', 0.5)
-        if 'confidence_history' not in metrics:
-            metrics['confidence_history'] = []
-        metrics['confidence_history'].append(confidence)
+        metrics.confidence_history.append(negotiation_result.get('confidence', 0.5))
     
     async def _handle_session_error(self, session_id: str, error_message: str):
         """Handle session errors gracefully"""
         
         if session_id in self.active_sessions:
             session_data = self.active_sessions[session_id]
-            session = session_data['session']
+            session = session_data.session
             
             session.status = SessionStatus.FAILED.value
             session.outcome = SessionOutcome.TECHNICAL_ERROR.value
@@ -619,7 +784,7 @@ class AdvancedSessionManager:
             
             # Log error message
             error_msg = ChatMessage(
-                id=str(uuid.uuid4()),
+                id=token_hex(16),
                 session_id=session_id,
                 sender="system",
                 content=f"Session error: {error_message}",
@@ -628,7 +793,7 @@ class AdvancedSessionManager:
             )
             
             session.messages.append(error_msg)
-            await self.db.save_session(session)
+            await self._save_session_now(session)
     
     async def _generate_session_summary(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive session summary"""
@@ -675,22 +840,26 @@ class SessionAnalytics:
         """Calculate comprehensive session metrics"""
         
         session = session_data['session']
-        product = session_data['product']
+        messages = session.messages
+        final_price = session.final_price
+        original_price = session_data['product'].price
+        message_count = len(messages)
+        duration = self._calculate_duration(session)
         
-        # Basic metrics
+        # Basic metrics; one pass tallies messages per sender
+        sender_counts = Counter(m.sender for m in messages)
         metrics = {
-            'session_duration_minutes': self._calculate_duration(session),
-            'message_count': len(session.messages),
-            'ai_message_count': len([m for m in session.messages if m.sender == 'ai']),
-            'seller_message_count': len([m for m in session.messages if m.sender == 'seller'])
+            'session_duration_minutes': duration,
+            'message_count': message_count,
+            'ai_message_count': sender_counts['ai'],
+            'seller_message_count': sender_counts['seller']
         }
         
         # Price negotiation metrics
-        if session.final_price:
-            savings = product.price - session.final_price
-            savings_percentage = (savings / product.price) * 100
-            target_achievement = ((product.price - session.final_price) / 
-                                (product.price - session.user_params.target_price)) * 100
+        if final_price:
+            savings = original_price - final_price
+            savings_percentage = (savings / original_price) * 100
+            target_achievement = (savings / (original_price - session.user_params.target_price)) * 100
             
             metrics.update({
                 'price_savings': savings,
@@ -699,12 +868,11 @@ class SessionAnalytics:
             })
         
         # Efficiency metrics
-        if metrics['message_count'] > 0:
-            metrics['messages_per_minute'] = metrics['message_count'] / max(1, metrics['session_duration_minutes'])
+        if message_count > 0:
+            metrics['messages_per_minute'] = message_count / max(1, duration)
         
         # Strategy effectiveness
-        performance_data = session_data.get('performance_metrics', {})
-        metrics['negotiation_effectiveness'] = performance_data.get('negotiation_effectiveness', 0.0)
+        metrics['negotiation_effectiveness'] = session_data.get('performance_metrics', {}).get('negotiation_effectiveness', 0.0)
         
         return metrics
     
@@ -716,11 +884,74 @@ class SessionAnalytics:
         return 0
 
 
+# Learning records kept for recommendations; older ones are dropped at compaction
+LEARNING_RECORD_LIMIT = 1000
+
+# Seconds a strategy recommendation is reused for the same category and approach
+RECOMMENDATION_CACHE_TTL = 60
+
+# Appends between compactions of the learning-data file back down to the record limit
+LEARNING_COMPACT_EVERY = 100
+
+def _dump_learning_record(record: Dict[str, Any]) -> bytes:
+    """Serialize one learning record as a compact UTF-8 JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(record, separators=(',', ':'), default=str).encode() + b'\n'
+
+_load_learning_line = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Recommendation when no similar scenario has succeeded yet; callers receive copies
+_DEFAULT_RECOMMENDATION = MappingProxyType({
+    'success_rate': 0.6,  # Default assumption
+    'recommended_tactics': ('anchoring', 'reciprocity'),
+    'confidence': 0.3,  # Low confidence without historical data
+    'similar_scenarios_count': 0
+})
+
+# Session metrics kept in each learning record; the rest of the final metrics are not read back
+_LEARNING_METRIC_FIELDS = ('negotiation_effectiveness', 'price_savings', 'savings_percentage')
+
+_MARKET_POSITION_LABELS = ('underpriced', 'market_rate', 'overpriced')
+
+# Low-cardinality string fields repeated across learning records
+_INTERNED_RECORD_FIELDS = ('outcome', 'product_category', 'negotiation_approach', 'market_position')
+
+def _intern_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Share one string object per distinct category/approach/outcome value across parsed records"""
+    for field in _INTERNED_RECORD_FIELDS:
+        value = record.get(field)
+        if type(value) is str:
+            record[field] = sys.intern(value)
+    return record
+
+def _is_learning_record(record: Any) -> bool:
+    """Whether a parsed line is a record the category/approach index can hold"""
+    return isinstance(record, dict) and 'product_category' in record and 'negotiation_approach' in record
+
+def _record_key(record: Dict[str, Any]) -> tuple:
+    """Index key of a learning record: its product category and negotiation approach"""
+    return (record['product_category'], record['negotiation_approach'])
+
 class LearningEngine:
     """Machine learning engine for continuous improvement"""
     
     def __init__(self):
-        self.learning_data_file = "learning_data.json"
+        # Append-only JSON Lines: one record per line, so saving a record never rewrites the file
+        self.learning_data_file = "learning_data.jsonl"
+        # Pre-JSONL single-document file, imported once when no JSONL file exists yet
+        self.legacy_learning_data_file = "learning_data.json"
+        self._appends_since_compaction = 0
+        # Set when the file ends in a torn line, so the next append starts on a new line
+        self._torn_tail = False
+        # In-memory ring of the most recent records, loaded from the file on first use
+        self._records: Optional[deque] = None
+        # The same records bucketed by (category, approach), oldest first within each bucket
+        self._records_by_key: Dict[tuple, deque] = {}
+        # Serializes loading and saving so file appends and compactions never interleave
+        self._learning_lock = asyncio.Lock()
+        # Recommendations by (category, approach); cleared whenever a record is saved
+        self._recommendation_cache = TTLCache(maxsize=256, ttl=RECOMMENDATION_CACHE_TTL)
     
     async def update_from_session(
         self, 
@@ -731,17 +962,22 @@ class LearningEngine:
         """Update learning models from completed session"""
         
         try:
+            product = session_data['product']
+            params = session_data['session'].user_params
+            # Resolve the approach enum once
+            approach = params.approach.value if hasattr(params.approach, 'value') else params.approach
+            
             # Extract learning features
             learning_record = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': time.time(),  # Epoch seconds; only stored, never queried
                 'outcome': outcome.value,
-                'product_category': session_data['product'].category,
-                'negotiation_approach': session_data['session'].user_params.approach.value if hasattr(session_data['session'].user_params.approach, 'value') else session_data['session'].user_params.approach,
-                'price_gap': session_data['product'].price - session_data['session'].user_params.target_price,
+                'product_category': product.category,
+                'negotiation_approach': approach,
+                'price_gap': product.price - params.target_price,
                 'market_position': self._calculate_market_position(session_data),
                 'tactics_used': session_data.get('tactics_history', []),
                 'seller_personality': session_data.get('seller_personality'),
-                'metrics': metrics
+                'metrics': {k: metrics[k] for k in _LEARNING_METRIC_FIELDS if k in metrics}
             }
             
             # Save learning record
@@ -763,92 +999,147 @@ class LearningEngine:
         if not avg_market_price:
             return 'unknown'
         
+        # Each bound crossed moves one label up; 0.8 and 1.2 themselves count as market rate
         ratio = product_price / avg_market_price
-        
-        if ratio > 1.2:
-            return 'overpriced'
-        elif ratio < 0.8:
-            return 'underpriced'
-        else:
-            return 'market_rate'
+        return _MARKET_POSITION_LABELS[(ratio >= 0.8) + (ratio > 1.2)]
     
     async def _save_learning_record(self, record: Dict[str, Any]):
         """Save learning record to persistent storage"""
         
         try:
-            # Load existing data
-            try:
-                with open(self.learning_data_file, 'r') as f:
-                    learning_data = json.load(f)
-            except FileNotFoundError:
-                learning_data = []
-            
-            # Add new record
-            learning_data.append(record)
-            
-            # Keep only last 1000 records
-            if len(learning_data) > 1000:
-                learning_data = learning_data[-1000:]
-            
-            # Save back
-            with open(self.learning_data_file, 'w') as f:
-                json.dump(learning_data, f, indent=2)
+            async with self._learning_lock:
+                # The ring drops the oldest record itself once it holds LEARNING_RECORD_LIMIT
+                records = await self._load_learning_data()
+                if len(records) == records.maxlen:
+                    # The oldest record is about to fall out of the ring; it heads its bucket too
+                    self._unindex_oldest(records[0])
+                # Interned like records loaded from disk, so the ring shares one copy of each key string
+                record = _intern_record(record)
+                records.append(record)
+                self._records_by_key.setdefault(_record_key(record), deque()).append(record)
+                self._recommendation_cache.clear()
+                
+                # Periodically trim the file to the records still in the ring
+                compacted = None
+                self._appends_since_compaction += 1
+                if self._appends_since_compaction >= LEARNING_COMPACT_EVERY:
+                    self._appends_since_compaction = 0
+                    compacted = b''.join(map(_dump_learning_record, records))
+                
+                # File writes run in the default executor so they don't stall the event loop
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._write_learning_file, _dump_learning_record(record), compacted)
                 
         except Exception as e:
             logger.error(f"Error saving learning record: {e}")
     
+    def _write_learning_file(self, line: bytes, compacted: Optional[bytes]):
+        """Append one record line, then swap in the compacted file if one was built (blocking)"""
+        if self._torn_tail:
+            line = b'\n' + line
+            self._torn_tail = False
+        with open(self.learning_data_file, 'ab') as f:
+            f.write(line)
+        if compacted is not None:
+            # Written to a temp file and swapped in, so a crash mid-write can't lose the history
+            tmp_path = self.learning_data_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(compacted)
+            os.replace(tmp_path, self.learning_data_file)
+    
+    def _read_learning_file(self) -> deque:
+        """
+        Parse the most recent LEARNING_RECORD_LIMIT records from the file (blocking).
+        Lines that fail to decode (e.g. a write torn by a crash) are skipped and logged.
+        """
+        try:
+            # Read the whole file in one call and parse line by line from memory
+            with open(self.learning_data_file, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return self._import_legacy_learning_file()
+        
+        self._torn_tail = bool(data) and not data.endswith(b'\n')
+        records = deque(maxlen=LEARNING_RECORD_LIMIT)
+        skipped = 0
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = _load_learning_line(line)
+            except ValueError:
+                record = None
+            if _is_learning_record(record):
+                records.append(_intern_record(record))
+            else:
+                skipped += 1
+        
+        if skipped:
+            logger.warning("Skipped %d unreadable line(s) in %s", skipped, self.learning_data_file)
+        return records
+    
+    def _import_legacy_learning_file(self) -> deque:
+        """Convert records from the old single-document JSON file to JSON Lines (blocking)"""
+        records = deque(maxlen=LEARNING_RECORD_LIMIT)
+        try:
+            with open(self.legacy_learning_data_file, 'rb') as f:
+                legacy = json.loads(f.read())
+        except FileNotFoundError:
+            return records
+        except ValueError as e:
+            logger.warning("Could not import %s: %s", self.legacy_learning_data_file, e)
+            return records
+        
+        if isinstance(legacy, list):
+            records.extend(_intern_record(record) for record in legacy if _is_learning_record(record))
+        
+        # Writing the JSONL file means the legacy file is never read again
+        tmp_path = self.learning_data_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(map(_dump_learning_record, records)))
+        os.replace(tmp_path, self.learning_data_file)
+        logger.info("Imported %d learning records from %s", len(records), self.legacy_learning_data_file)
+        return records
+    
+    async def _load_learning_data(self) -> deque:
+        """Most recent LEARNING_RECORD_LIMIT records; the file is read only on first use.
+        Callers hold _learning_lock."""
+        if self._records is None:
+            loop = asyncio.get_running_loop()
+            self._records = await loop.run_in_executor(None, self._read_learning_file)
+            self._records_by_key = {}
+            for record in self._records:
+                self._records_by_key.setdefault(_record_key(record), deque()).append(record)
+        return self._records
+    
+    def _unindex_oldest(self, record: Dict[str, Any]):
+        """Drop the oldest record from its (category, approach) bucket"""
+        key = _record_key(record)
+        bucket = self._records_by_key[key]
+        bucket.popleft()
+        if not bucket:
+            del self._records_by_key[key]
+    
     async def _update_strategy_scores(self, record: Dict[str, Any]):
         """Update effectiveness scores for different strategies"""
         
         # This would update ML models or rule-based scoring systems
         # For now, just log the update
-        logger.info(f"Learning update: {record['outcome']} for approach {record['negotiation_approach']}")
+        logger.info("Learning update: %s for approach %s", record['outcome'], record['negotiation_approach'])
     
     async def get_strategy_recommendations(self, product: Product, params: NegotiationParams) -> Dict[str, Any]:
         """Get AI-powered strategy recommendations based on learning"""
         
         try:
-            # Load historical data
-            with open(self.learning_data_file, 'r') as f:
-                learning_data = json.load(f)
-            
-            # Filter similar scenarios
-            similar_scenarios = [
-                record for record in learning_data
-                if (record['product_category'] == product.category and 
-                    record['negotiation_approach'] == (params.approach.value if hasattr(params.approach, 'value') else params.approach))
-            ]
-            
-            if similar_scenarios:
-                # Calculate success rate
-                successful = len([r for r in similar_scenarios if r['outcome'] == 'success'])
-                success_rate = successful / len(similar_scenarios)
-                
-                # Find best performing tactics
-                successful_records = [r for r in similar_scenarios if r['outcome'] == 'success']
-                if successful_records:
-                    tactics_frequency = {}
-                    for record in successful_records:
-                        for tactic in record.get('tactics_used', []):
-                            tactics_frequency[tactic] = tactics_frequency.get(tactic, 0) + 1
-                    
-                    recommended_tactics = sorted(tactics_frequency.items(), 
-                                               key=lambda x: x[1], reverse=True)[:3]
-                    
-                    return {
-                        'success_rate': success_rate,
-                        'recommended_tactics': [tactic for tactic, count in recommended_tactics],
-                        'confidence': min(1.0, len(similar_scenarios) / 10),  # More data = higher confidence
-                        'similar_scenarios_count': len(similar_scenarios)
-                    }
-            
-            # Default recommendations
-            return {
-                'success_rate': 0.6,  # Default assumption
-                'recommended_tactics': ['anchoring', 'reciprocity'],
-                'confidence': 0.3,  # Low confidence without historical data
-                'similar_scenarios_count': 0
-            }
+            approach = params.approach.value if hasattr(params.approach, 'value') else params.approach
+            key = (product.category, approach)
+            cached = self._recommendation_cache.get(key)
+            if cached is None:
+                async with self._learning_lock:
+                    await self._load_learning_data()
+                cached = self._recommendation_cache[key] = self._compute_recommendations(*key)
+            # Callers get their own copy of the cached result
+            return {**cached, 'recommended_tactics': list(cached['recommended_tactics'])}
             
         except Exception as e:
             logger.error(f"Error getting strategy recommendations: {e}")
@@ -857,4 +1148,38 @@ class LearningEngine:
                 'recommended_tactics': [],
                 'confidence': 0.2,
                 'similar_scenarios_count': 0
-            }
\ No newline at end of file
+            }
+    
+    def _compute_recommendations(self, category: str, approach: str) -> Mapping[str, Any]:
+        """Score the loaded learning records for one product category and negotiation approach"""
+        
+        # Only the matching bucket of the loaded history is scanned
+        similar_scenarios = self._records_by_key.get((category, approach))
+        if not similar_scenarios:
+            # Cold start or an unseen category/approach pair
+            return _DEFAULT_RECOMMENDATION
+        
+        # One pass over similar scenarios: count them, count successes, and tally the
+        # tactics used in successful ones
+        similar_count = success_count = 0
+        tactics_frequency = {}
+        for record in similar_scenarios:
+            similar_count += 1
+            if record['outcome'] == 'success':
+                success_count += 1
+                for tactic in record.get('tactics_used', []):
+                    tactics_frequency[tactic] = tactics_frequency.get(tactic, 0) + 1
+        
+        if success_count:
+            # Find best performing tactics
+            recommended_tactics = nlargest(3, tactics_frequency.items(), key=itemgetter(1))
+            
+            return {
+                'success_rate': success_count / similar_count,
+                'recommended_tactics': [tactic for tactic, count in recommended_tactics],
+                'confidence': min(1.0, similar_count / 10),  # More data = higher confidence
+                'similar_scenarios_count': similar_count
+            }
+        
+        # Default recommendations
+        return _DEFAULT_RECOMMENDATION
\ No newline at end of file